@@ -1,25 +1,19 @@
 #!/usr/bin/env python3
 """Debug AST structure to fix tests"""
 
-import subprocess
 import json
 import os
 
+from spelunk_host import get_process, loads, request_payload
+
 def send_request(process, method, params=None):
-    request = {
-        "jsonrpc": "2.0",
-        "id": 1,
-        "method": method,
-        "params": params or {}
-    }
-    
-    process.stdin.write(json.dumps(request) + '\n')
+    process.stdin.write(request_payload(method, 1, params or {}))
     process.stdin.flush()
     
     response_line = process.stdout.readline()
     
     try:
-        response = json.loads(response_line)
+        response = loads(response_line)
         if "error" in response and response["error"] is not None:
             print(f"ERROR: {response['error']}")
             return None
@@ -28,26 +22,23 @@ def send_request(process, method, params=None):
             content = result["content"]
             if content and len(content) > 0 and content[0].get("type") == "text":
                 try:
-                    return json.loads(content[0]["text"])
+                    return loads(content[0]["text"])
                 except:
                     return content[0]["text"]
         return result
-    except json.JSONDecodeError as e:
+    except ValueError as e:
         print(f"Failed to parse response: {e}")
         return None
 
-# Start server
-process = subprocess.Popen(
-    ["dotnet", "run", "--project", "src/Spelunk.Server/Spelunk.Server.csproj"],
-    stdin=subprocess.PIPE,
-    stdout=subprocess.PIPE,
-    stderr=subprocess.PIPE,
-    text=True,
-    bufsize=1
-)
+# Compute paths once; the server needs them absolute and they don't change.
+# The test file has to live under the server's allowed paths, so it stays
+# next to the workspace rather than in a tmpfs directory.
+TEST_FILE = os.path.abspath("test-ast-debug.cs")
+TEST_PROJECT = os.path.abspath("test-workspace/TestProject.csproj")
 
-import time
-time.sleep(2)
+# Get the shared server; the initialize response doubles as the
+# readiness handshake, so no startup sleep is needed.
+process = get_process()
 
 # Initialize
 send_request(process, "initialize", {
@@ -68,54 +59,58 @@ test_code = """namespace TestNamespace
     }
 }"""
 
-with open("test-ast-debug.cs", "w") as f:
+with open(TEST_FILE, "w") as f:
     f.write(test_code)
 
-# Load workspace (use test file)
-send_request(process, "tools/call", {
-    "name": "spelunk-load-workspace",
-    "arguments": {
-        "path": os.path.abspath("test-workspace/TestProject.csproj")
-    }
-})
-
-# Get AST at the position
-print("\nGetting AST structure around '1' in '1 + 2'...")
-result = send_request(process, "tools/call", {
-    "name": "spelunk-get-ast",
-    "arguments": {
-        "file": os.path.abspath("test-ast-debug.cs"),
-        "depth": 5
-    }
-})
+try:
+    # Load workspace (use test file)
+    send_request(process, "tools/call", {
+        "name": "spelunk-load-workspace",
+        "arguments": {
+            "path": TEST_PROJECT
+        }
+    })
 
-if result:
-    print("\nAST Structure:")
-    print("Result type:", type(result))
-    if isinstance(result, dict) and "ast" in result:
-        print(json.dumps(result["ast"], indent=2))
-    else:
-        print("Unexpected result:", result)
+    # Get AST at the position. Scope the request to the method under
+    # inspection so the server only serializes (and we only parse) the
+    # subtree this script actually looks at, instead of a depth-5 dump of
+    # the whole file.
+    print("\nGetting AST structure around '1' in '1 + 2'...")
+    result = send_request(process, "tools/call", {
+        "name": "spelunk-get-ast",
+        "arguments": {
+            "file": TEST_FILE,
+            "root": "//method[TestMethod]",
+            "depth": 5
+        }
+    })
 
-# Navigate from position
-print("\nNavigating from position of '1'...")
-result = send_request(process, "tools/call", {
-    "name": "spelunk-navigate",
-    "arguments": {
-        "from": {
-            "file": os.path.abspath("test-ast-debug.cs"),
-            "line": 7,
-            "column": 21  # Position of "1"
-        },
-        "path": "parent",
-        "returnPath": True
-    }
-})
+    if result:
+        print("\nAST Structure:")
+        print("Result type:", type(result))
+        if isinstance(result, dict) and "ast" in result:
+            print(json.dumps(result["ast"], indent=2))
+        else:
+            print("Unexpected result:", result)
 
-if result and "navigatedTo" in result:
-    print("\nParent of '1':")
-    print(json.dumps(result["navigatedTo"], indent=2))
+    # Navigate from position
+    print("\nNavigating from position of '1'...")
+    result = send_request(process, "tools/call", {
+        "name": "spelunk-navigate",
+        "arguments": {
+            "from": {
+                "file": TEST_FILE,
+                "line": 7,
+                "column": 21  # Position of "1"
+            },
+            "path": "parent",
+            "returnPath": True
+        }
+    })
 
-# Clean up
-process.terminate()
-os.remove("test-ast-debug.cs")
\ No newline at end of file
+    if result and "navigatedTo" in result:
+        print("\nParent of '1':")
+        print(json.dumps(result["navigatedTo"], indent=2))
+finally:
+    # Clean up even on failure (the shared server is shut down at exit)
+    os.remove(TEST_FILE)
\ No newline at end of file
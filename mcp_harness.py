@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""Shared MCP client for the root-level analysis scripts.
+
+Each script used to carry its own copy of `MCPClient`, and each copy
+spawned (and tore down) its own server, paying the Roslyn workspace
+load every time. This module holds one client per allowed-paths
+configuration on top of the shared process from `spelunk_host`, so the
+workspace load is paid once per session and every transport fix lands
+in one place.
+"""
+
+import spelunk_host
+from spelunk_host import loads, request_payload, tool_payload
+
+
+class MCPClient:
+    """JSON-RPC client over the shared server process from spelunk_host."""
+
+    def __init__(self, allowed_paths=None):
+        self.process = spelunk_host.get_process(allowed_paths)
+        self.request_id = 0
+        self._loaded_workspaces = set()
+        self._initialized = False
+        self._data_flow_cache = {}
+
+    def initialize(self):
+        """Send the MCP initialize handshake once per client."""
+        if self._initialized:
+            return None
+        response = self.send_request("initialize", {
+            "protocolVersion": "2024-11-05",
+            "capabilities": {},
+            "clientInfo": {
+                "name": "mcp-harness",
+                "version": "1.0.0"
+            }
+        })
+        self._initialized = True
+        return response
+
+    def send_request(self, method, params):
+        """Send a request and block for its response."""
+        self.request_id += 1
+        return self._exchange(request_payload(method, self.request_id, params))
+
+    def call_tool(self, name, arguments):
+        """Invoke an MCP tool and return the raw JSON-RPC response."""
+        self.request_id += 1
+        return self._exchange(tool_payload(name, self.request_id, arguments))
+
+    def call_tools_batch(self, calls):
+        """Pipeline several tool calls: one write, then all responses.
+
+        Responses are demultiplexed by JSON-RPC id and returned in call
+        order, so server-side reordering is safe.
+        """
+        ids = []
+        payloads = []
+        for name, arguments in calls:
+            self.request_id += 1
+            ids.append(self.request_id)
+            payloads.append(tool_payload(name, self.request_id, arguments))
+
+        self.process.stdin.write(b''.join(payloads))
+        self.process.stdin.flush()
+
+        responses_by_id = {}
+        for _ in ids:
+            response_line = self.process.stdout.readline()
+            if not response_line:
+                break
+            response = loads(response_line)
+            responses_by_id[response.get("id")] = response
+
+        return [responses_by_id.get(request_id) for request_id in ids]
+
+    def _exchange(self, payload):
+        """Write one pre-serialized request line and read its response."""
+        self.process.stdin.write(payload)
+        self.process.stdin.flush()
+
+        response_line = self.process.stdout.readline()
+        if response_line:
+            return loads(response_line)
+        return None
+
+    def get_data_flow(self, arguments):
+        """Call spelunk-get-data-flow, memoized by region.
+
+        Analysis is deterministic for a given region, so identical calls
+        across a session (or the same region queried with and without
+        control flow) can share one server round-trip. The cached call
+        always requests control flow, a superset of the data-flow-only
+        response, and callers ignore the ControlFlow field when they
+        didn't ask for it.
+        """
+        key = (arguments.get("file"),
+               arguments.get("startLine"), arguments.get("startColumn"),
+               arguments.get("endLine"), arguments.get("endColumn"),
+               arguments.get("workspacePath"))
+        response = self._data_flow_cache.get(key)
+        if response is None:
+            superset = dict(arguments, includeControlFlow=True)
+            response = self.call_tool("spelunk-get-data-flow", superset)
+            self._data_flow_cache[key] = response
+        return response
+
+    def load_workspace(self, workspace_path):
+        """Load a workspace, skipping the call if this client already has it.
+
+        The server keeps workspaces resident, so repeat loads from the
+        same session are pure round-trip waste.
+        """
+        if workspace_path in self._loaded_workspaces:
+            return None
+        response = self.call_tool("spelunk-load-workspace", {
+            "workspacePath": workspace_path
+        })
+        self._loaded_workspaces.add(workspace_path)
+        return response
+
+    def close(self):
+        """Release the client. The shared server stays up for the session."""
+        # Process teardown is handled by spelunk_host at interpreter exit.
+        pass
+
+
+def tool_result(response):
+    """Extract and parse the JSON payload nested in a tool response.
+
+    Tool responses carry their structured data as a JSON string inside
+    result.content[0].text. Parse it here in one pass so callers don't
+    each re-walk the envelope and re-scan the text. Returns the parsed
+    object, the raw text if it isn't JSON, or None if the response has
+    no content.
+    """
+    if not response:
+        return None
+    result = response.get("result")
+    if not result:
+        return None
+    content = result.get("content")
+    if not content:
+        return None
+    text = content[0].get("text")
+    if text is None:
+        return None
+    try:
+        return loads(text)
+    except ValueError:
+        return text
+
+
+_clients = {}
+
+
+def client(allowed_paths=None):
+    """Return the shared client for the given allowed paths."""
+    key = allowed_paths or ''
+    instance = _clients.get(key)
+    if instance is None:
+        instance = MCPClient(allowed_paths)
+        _clients[key] = instance
+    return instance
+
+
+def default_client():
+    """Return the shared client with no allowed-paths restriction."""
+    return client()
@@ -3,29 +3,37 @@
 Run unit tests for AST navigation functionality
 """
 
+import shlex
 import subprocess
 import sys
 import os
 
 def run_command(command, description):
-    """Run a command and return success status"""
+    """Run a command, streaming its output, and return success status"""
     print(f"\n{'='*60}")
     print(f"Running: {description}")
     print(f"Command: {command}")
     print('='*60)
-    
-    try:
-        result = subprocess.run(command, shell=True, check=True, capture_output=True, text=True)
-        print("STDOUT:", result.stdout)
-        if result.stderr:
-            print("STDERR:", result.stderr)
+
+    # No shell: exec dotnet directly and stream output line-by-line so
+    # progress is visible live and a detailed test log is never buffered
+    # whole in memory.
+    proc = subprocess.Popen(
+        shlex.split(command),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        bufsize=1 << 16
+    )
+    for line in proc.stdout:
+        sys.stdout.write(line)
+    returncode = proc.wait()
+
+    if returncode == 0:
         print(f"✅ {description} completed successfully")
         return True
-    except subprocess.CalledProcessError as e:
-        print(f"❌ {description} failed with exit code {e.returncode}")
-        print("STDOUT:", e.stdout)
-        print("STDERR:", e.stderr)
-        return False
+    print(f"❌ {description} failed with exit code {returncode}")
+    return False
 
 def main():
     """Run all unit tests"""
@@ -33,17 +41,20 @@ def main():
     
     # Change to project directory
     os.chdir(os.path.dirname(os.path.abspath(__file__)))
-    
-    # Build the test project
-    if not run_command("dotnet build tests/Spelunk.Server.Tests.csproj", "Building test project"):
-        return 1
-    
-    # Run the tests
-    if not run_command("dotnet test tests/Spelunk.Server.Tests.csproj --verbosity normal", "Running unit tests"):
+
+    # Keep MSBuild resident between the build and test invocations so the
+    # project graph is evaluated once, not per spawn (SDK >= 7).
+    os.environ["DOTNET_CLI_USE_MSBUILD_SERVER"] = "true"
+
+    # Build the test project (parallel MSBuild)
+    if not run_command("dotnet build -m tests/Spelunk.Server.Tests.csproj", "Building test project"):
         return 1
-    
-    # Run tests with detailed output
-    if not run_command("dotnet test tests/Spelunk.Server.Tests.csproj --logger 'console;verbosity=detailed'", "Running tests with detailed output"):
+
+    # Run the tests once with detailed output (it supersedes the normal run),
+    # skipping the redundant restore/build since we just built above.
+    # In-assembly parallelism comes from tests/xunit.runner.json; MaxCpuCount
+    # lets VSTest spread test sources across cores as well.
+    if not run_command("dotnet test tests/Spelunk.Server.Tests.csproj --no-restore --no-build --logger 'console;verbosity=detailed' -- RunConfiguration.MaxCpuCount=0", "Running unit tests"):
         return 1
     
     print("\n🎉 All tests completed successfully!")
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""Shared MCP server process for the root-level test scripts.
+
+Spawning `dotnet run` per script pays MSBuild evaluation and JIT startup
+every time. This module keeps one long-lived server process per
+allowed-paths configuration and hands it out to every script that imports
+it, preferring a pre-built binary over `dotnet run` when one exists.
+"""
+
+import atexit
+import glob
+import json as _stdlib_json
+import os
+import subprocess
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+try:
+    import orjson as _orjson
+except ImportError:
+    _orjson = None
+
+if _orjson is not None:
+    def dumps(obj) -> bytes:
+        """Serialize a JSON-RPC payload to bytes (orjson-accelerated)."""
+        return _orjson.dumps(obj)
+
+    loads = _orjson.loads
+else:
+    def dumps(obj) -> bytes:
+        """Serialize a JSON-RPC payload to bytes (stdlib fallback, compact)."""
+        return _stdlib_json.dumps(obj, separators=(',', ':')).encode()
+
+    loads = _stdlib_json.loads
+
+import socket
+
+SERVER_PROJECT = 'src/Spelunk.Server'
+
+# Pre-serialized envelope prefixes, keyed by method / tool name. The
+# outer JSON-RPC frame is constant per tool; only the id and arguments
+# vary, so serialize the constant part once.
+_method_prefixes = {}
+_tool_prefixes = {}
+
+
+def request_payload(method, request_id, params):
+    """Build a JSON-RPC request line (bytes), reusing the per-method envelope."""
+    prefix = _method_prefixes.get(method)
+    if prefix is None:
+        prefix = b'{"jsonrpc":"2.0","method":' + dumps(method) + b',"id":'
+        _method_prefixes[method] = prefix
+    return prefix + str(request_id).encode() + b',"params":' + dumps(params) + b'}\n'
+
+
+def tool_payload(tool, request_id, arguments):
+    """Build a tools/call request line (bytes), reusing the per-tool envelope."""
+    prefix = _tool_prefixes.get(tool)
+    if prefix is None:
+        prefix = b',"params":{"name":' + dumps(tool) + b',"arguments":'
+        _tool_prefixes[tool] = prefix
+    return (b'{"jsonrpc":"2.0","method":"tools/call","id":' + str(request_id).encode()
+            + prefix + dumps(arguments) + b'}}\n')
+
+# Socket path used by `spelunk socket` (see Modes/SocketMode.cs). When a
+# daemon is listening there, test drivers reuse its warm workspaces
+# instead of paying the MSBuild/Roslyn load on every invocation.
+SOCKET_PATH = os.path.expanduser('~/.spelunk/server.sock')
+
+# Large pipe buffers: AST dumps and symbol lists routinely exceed the
+# 64 KiB kernel default, and bigger userspace buffers cut syscall count.
+PIPE_BUFFER_SIZE = 1 << 20
+
+# Linux-only fcntl to grow the kernel pipe capacity to match.
+_F_SETPIPE_SZ = 1031
+
+# Kernel socket buffers for the daemon connection. 256 KiB keeps large
+# responses (whole-project symbol dumps) flowing without the sender
+# blocking on the default-sized buffer.
+SOCKET_BUFFER_SIZE = 256 * 1024
+
+
+def _enlarge_pipes(process):
+    """Best-effort bump of kernel pipe capacity (Linux only)."""
+    if fcntl is None:
+        return
+    for pipe in (process.stdin, process.stdout, process.stderr):
+        try:
+            fcntl.fcntl(pipe.fileno(), _F_SETPIPE_SZ, PIPE_BUFFER_SIZE)
+        except OSError:
+            pass
+
+_processes = {}
+
+
+# Output directory for publish(); dotnet exec of a published build skips
+# the MSBuild/CLI work `dotnet run` does before Main.
+PUBLISH_DIR = '.spelunk-bin'
+
+
+def _source_mtime():
+    """Newest mtime among the server's sources and project file."""
+    newest = 0.0
+    for pattern in ('**/*.cs', '*.csproj'):
+        for path in glob.glob(os.path.join(SERVER_PROJECT, pattern), recursive=True):
+            newest = max(newest, os.path.getmtime(path))
+    return newest
+
+
+def publish(force=False):
+    """Publish the server into PUBLISH_DIR, skipping when it is current.
+
+    Cached by mtime: the publish only reruns when a source file is newer
+    than the published binary. Returns the path to the published dll.
+    """
+    dll = os.path.join(PUBLISH_DIR, 'Spelunk.Server.dll')
+    if not force and os.path.exists(dll) and os.path.getmtime(dll) >= _source_mtime():
+        return dll
+    subprocess.run(
+        ['dotnet', 'publish', SERVER_PROJECT, '-c', 'Release', '-o', PUBLISH_DIR],
+        check=True, capture_output=True)
+    return dll
+
+
+def _server_command():
+    """Prefer a published or pre-built server binary over `dotnet run`."""
+    published = os.path.join(PUBLISH_DIR, 'Spelunk.Server.dll')
+    if os.path.exists(published):
+        return ['dotnet', published]
+    pattern = os.path.join(SERVER_PROJECT, 'bin', 'Release', 'net*', 'Spelunk.Server.dll')
+    candidates = sorted(glob.glob(pattern))
+    if candidates:
+        return ['dotnet', candidates[-1]]
+    return ['dotnet', 'run', '--project', SERVER_PROJECT, '--no-build']
+
+
+def launch(allowed_paths=None):
+    """Start a fresh server process (uncached). Most callers want get_process."""
+    env = os.environ.copy()
+    if allowed_paths:
+        env['SPELUNK_ALLOWED_PATHS'] = allowed_paths
+
+    process = subprocess.Popen(
+        _server_command(),
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        bufsize=PIPE_BUFFER_SIZE,
+        env=env
+    )
+    _enlarge_pipes(process)
+    return process
+
+
+class SocketTransport:
+    """Popen-compatible wrapper around a connection to a socket daemon."""
+
+    def __init__(self, sock):
+        self._socket = sock
+        self.stdin = sock.makefile('wb', buffering=PIPE_BUFFER_SIZE)
+        self.stdout = sock.makefile('rb', buffering=PIPE_BUFFER_SIZE)
+        self.stderr = None
+
+    def poll(self):
+        return None
+
+    def terminate(self):
+        self.close()
+
+    def wait(self):
+        return 0
+
+    def close(self):
+        self.stdin.close()
+        self.stdout.close()
+        self._socket.close()
+
+
+def _connect_daemon():
+    """Connect to a running `spelunk socket` daemon, or return None."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_BUFFER_SIZE)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUFFER_SIZE)
+        sock.connect(SOCKET_PATH)
+    except OSError:
+        # No daemon (or a stale socket file left by a crash)
+        sock.close()
+        return None
+    return SocketTransport(sock)
+
+
+def get_process(allowed_paths=None):
+    """Return the shared server for the given allowed paths.
+
+    Prefers a running `spelunk socket` daemon, whose loaded workspaces
+    survive between driver invocations; otherwise starts (and caches) a
+    server process. Either way the transport is shut down at interpreter
+    exit, so callers must not terminate it themselves.
+    """
+    key = allowed_paths or ''
+    process = _processes.get(key)
+    if process is not None and process.poll() is None:
+        return process
+
+    process = _connect_daemon() or launch(allowed_paths)
+    _processes[key] = process
+    return process
+
+
+def _shutdown():
+    for process in _processes.values():
+        if isinstance(process, SocketTransport):
+            # Leave the daemon running for the next invocation
+            process.close()
+        elif process.poll() is None:
+            process.stdin.close()
+            process.terminate()
+            process.wait()
+
+
+atexit.register(_shutdown)
@@ -73,7 +73,7 @@ public class DotnetWorkspaceManager : IDisposable
         _cleanupTimer = new Timer(CleanupStaleWorkspaces, null, TimeSpan.FromMinutes(1), cleanupInterval);
     }
     
-    public async Task<(bool success, string message, Workspace? workspace, string workspaceId)> LoadWorkspaceAsync(string path, string? workspaceId = null)
+    public async Task<(bool success, string message, Workspace? workspace, string workspaceId)> LoadWorkspaceAsync(string path, string? workspaceId = null, string? engine = null)
     {
         try
         {
@@ -112,6 +112,12 @@ public class DotnetWorkspaceManager : IDisposable
                      path.EndsWith(".vbproj", StringComparison.OrdinalIgnoreCase) ||
                      path.EndsWith(".fsproj", StringComparison.OrdinalIgnoreCase))
             {
+                if (string.Equals(engine, "staticgraph", StringComparison.OrdinalIgnoreCase) &&
+                    path.EndsWith(".csproj", StringComparison.OrdinalIgnoreCase))
+                {
+                    return LoadProjectStatic(path, workspaceId);
+                }
+
                 return await LoadProjectAsync(path, workspaceId);
             }
             else
@@ -212,6 +218,65 @@ public class DotnetWorkspaceManager : IDisposable
         
         return (true, $"Project '{project.Name}' loaded successfully", workspace, workspaceId);
     }
+
+    private (bool success, string message, Workspace? workspace, string workspaceId) LoadProjectStatic(string projectPath, string workspaceId)
+    {
+        // Fast-path loader for test fixtures: skips MSBuild's design-time
+        // build entirely and assembles an AdhocWorkspace from the sources
+        // next to the project file, referencing the runtime's trusted
+        // platform assemblies. Semantic info is limited to what those
+        // references provide, which is enough for syntax-level tooling.
+        var projectDir = Path.GetDirectoryName(projectPath)!;
+        var projectName = Path.GetFileNameWithoutExtension(projectPath);
+
+        var workspace = new AdhocWorkspace();
+
+        var trustedAssemblies = (string?)AppContext.GetData("TRUSTED_PLATFORM_ASSEMBLIES") ?? "";
+        var references = trustedAssemblies
+            .Split(Path.PathSeparator, StringSplitOptions.RemoveEmptyEntries)
+            .Select(assemblyPath => (MetadataReference)MetadataReference.CreateFromFile(assemblyPath))
+            .ToList();
+
+        var projectInfo = ProjectInfo.Create(
+            ProjectId.CreateNewId(),
+            VersionStamp.Create(),
+            projectName,
+            projectName,
+            LanguageNames.CSharp,
+            filePath: projectPath,
+            compilationOptions: new CSharpCompilationOptions(OutputKind.DynamicallyLinkedLibrary),
+            metadataReferences: references);
+
+        var project = workspace.AddProject(projectInfo);
+
+        var binDir = Path.DirectorySeparatorChar + "bin" + Path.DirectorySeparatorChar;
+        var objDir = Path.DirectorySeparatorChar + "obj" + Path.DirectorySeparatorChar;
+        var sourceCount = 0;
+        foreach (var sourceFile in Directory.EnumerateFiles(projectDir, "*.cs", SearchOption.AllDirectories))
+        {
+            if (sourceFile.Contains(binDir) || sourceFile.Contains(objDir))
+                continue;
+
+            workspace.AddDocument(DocumentInfo.Create(
+                DocumentId.CreateNewId(project.Id),
+                Path.GetFileName(sourceFile),
+                loader: new FileTextLoader(sourceFile, defaultEncoding: null),
+                filePath: sourceFile));
+            sourceCount++;
+        }
+
+        var entry = new WorkspaceEntry
+        {
+            Workspace = workspace,
+            Path = projectPath
+        };
+
+        _workspaces[workspaceId] = entry;
+
+        _logger.LogInformation("Loaded project statically: {Name} with {Count} source files, ID: {WorkspaceId}", projectName, sourceCount, workspaceId);
+
+        return (true, $"Project '{projectName}' loaded statically with {sourceCount} source files", workspace, workspaceId);
+    }
     
     // F# methods temporarily disabled for diagnostic PoC
     // public IReadOnlyList<FSharpProjectInfo> GetFSharpProjects(string? workspaceId = null)
@@ -3687,10 +3752,40 @@ public class DotnetWorkspaceManager : IDisposable
         };
     }
     
-    public async Task<Either<SpelunkError, DataFlowResult>> GetDataFlowAnalysisAsync(string filePath, int startLine, int startColumn, int endLine, int endColumn, bool includeControlFlow, string? workspaceId)
+    public async Task<Either<SpelunkError, DataFlowResult>> GetDataFlowAnalysisAsync(string filePath, int startLine, int startColumn, int endLine, int endColumn, bool includeControlFlow, string? workspaceId, int? maxVariableFlows = null)
     {
-        var result = new DataFlowResult();
+        var workspacesToSearch = GetWorkspacesToSearch(workspaceId);
+        if (!workspacesToSearch.Any())
+            return WorkspaceNotFound.NoWorkspace(workspaceId);
 
+        var workspace = workspacesToSearch.First();
+        var solution = workspace.CurrentSolution;
+        var document = GetDocumentByPath(solution, filePath);
+
+        if (document == null)
+            return CodeEditFailed.FileNotFound(filePath);
+
+        var syntaxTree = await document.GetSyntaxTreeAsync();
+        if (syntaxTree == null)
+            return CodeEditFailed.ParseFailed(filePath);
+
+        var semanticModel = await document.GetSemanticModelAsync();
+        if (semanticModel == null)
+            return CodeEditFailed.SemanticModelFailed(filePath);
+
+        var sourceText = await document.GetTextAsync();
+        var root = await syntaxTree.GetRootAsync();
+
+        return AnalyzeDataFlowRegion(filePath, sourceText, root, semanticModel, startLine, startColumn, endLine, endColumn, includeControlFlow, maxVariableFlows);
+    }
+
+    /// <summary>
+    /// Runs data flow analysis for several regions of the same file in one call.
+    /// The document, syntax tree and semantic model are resolved once and reused
+    /// for every region, so the expensive bind is paid once per batch.
+    /// </summary>
+    public async Task<Either<SpelunkError, List<DataFlowResult>>> GetDataFlowAnalysisBatchAsync(string filePath, IReadOnlyList<DataFlowRegion> regions, bool includeControlFlow, string? workspaceId, int? maxVariableFlows = null)
+    {
         var workspacesToSearch = GetWorkspacesToSearch(workspaceId);
         if (!workspacesToSearch.Any())
             return WorkspaceNotFound.NoWorkspace(workspaceId);
@@ -3710,11 +3805,50 @@ public class DotnetWorkspaceManager : IDisposable
         if (semanticModel == null)
             return CodeEditFailed.SemanticModelFailed(filePath);
 
+        var sourceText = await document.GetTextAsync();
+        var root = await syntaxTree.GetRootAsync();
+
+        var results = new List<DataFlowResult>(regions.Count);
+        foreach (var region in regions)
+        {
+            var analysis = AnalyzeDataFlowRegion(filePath, sourceText, root, semanticModel,
+                region.StartLine, region.StartColumn, region.EndLine, region.EndColumn, includeControlFlow, maxVariableFlows);
+
+            // A failed region should not fail the whole batch; report it
+            // in-place so results stay aligned with the request order
+            results.Add(analysis.Match(
+                Right: r => r,
+                Left: error => new DataFlowResult
+                {
+                    Region = new RegionInfo
+                    {
+                        File = filePath,
+                        StartLine = region.StartLine,
+                        StartColumn = region.StartColumn,
+                        EndLine = region.EndLine,
+                        EndColumn = region.EndColumn
+                    },
+                    Warnings =
+                    {
+                        new DataFlowWarning
+                        {
+                            Type = "AnalysisError",
+                            Message = error.Message,
+                            Location = $"{region.StartLine}:{region.StartColumn}"
+                        }
+                    }
+                }));
+        }
+
+        return results;
+    }
+
+    private Either<SpelunkError, DataFlowResult> AnalyzeDataFlowRegion(string filePath, SourceText sourceText, SyntaxNode root, SemanticModel semanticModel, int startLine, int startColumn, int endLine, int endColumn, bool includeControlFlow, int? maxVariableFlows = null)
+    {
+        var result = new DataFlowResult();
+
         try
         {
-                
-            var sourceText = await document.GetTextAsync();
-            
             // Convert line/column to text positions
             var startPosition = sourceText.Lines.GetPosition(new LinePosition(startLine - 1, startColumn - 1));
             var endPosition = sourceText.Lines.GetPosition(new LinePosition(endLine - 1, endColumn - 1));
@@ -3732,7 +3866,6 @@ public class DotnetWorkspaceManager : IDisposable
             };
             
             // Find statements in the region
-            var root = await syntaxTree.GetRootAsync();
             var nodesInSpan = root.DescendantNodes(span)
                 .Where(n => span.Contains(n.Span))
                 .ToList();
@@ -3787,9 +3920,14 @@ public class DotnetWorkspaceManager : IDisposable
                     UnsafeAddressTaken = dataFlow.UnsafeAddressTaken.Select(s => s.Name).ToList()
                 };
                 
-                // Analyze individual variables
+                // Analyze individual variables, stopping at the caller's
+                // display cap so untouched entries are never analyzed or
+                // serialized
                 foreach (var variable in dataFlow.VariablesDeclared.Union(dataFlow.DataFlowsIn, SymbolEqualityComparer.Default))
                 {
+                    if (maxVariableFlows.HasValue && result.VariableFlows.Count >= maxVariableFlows.Value)
+                        break;
+
                     var varFlow = AnalyzeVariableFlow(variable, statements, semanticModel, sourceText);
                     result.VariableFlows.Add(varFlow);
                 }
@@ -5422,6 +5560,17 @@ public class RegionInfo
     public string Code { get; set; } = "";
 }
 
+/// <summary>
+/// A line/column region passed to the batch data flow analysis tool.
+/// </summary>
+public class DataFlowRegion
+{
+    public int StartLine { get; set; }
+    public int StartColumn { get; set; }
+    public int EndLine { get; set; }
+    public int EndColumn { get; set; }
+}
+
 public class DataFlowInfo
 {
     public List<string> DataFlowsIn { get; set; } = new();
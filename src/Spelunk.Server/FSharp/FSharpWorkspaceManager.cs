@@ -25,6 +25,7 @@ public class FSharpWorkspaceManager : IDisposable
     private readonly FSharpChecker _checker;
     private readonly Dictionary<string, FSharpProjectOptions> _projectOptionsCache;
     private readonly Dictionary<string, (DateTime timestamp, FSharpParseFileResults parse, FSharpCheckFileResults check)> _fileCache;
+    private readonly Dictionary<string, (FSharpCheckFileResults check, FSharpSymbolUse[] uses)> _symbolUsesCache;
 
     public FSharpWorkspaceManager(ILogger<FSharpWorkspaceManager> logger)
     {
@@ -47,6 +48,7 @@ public class FSharpWorkspaceManager : IDisposable
             
         _projectOptionsCache = new Dictionary<string, FSharpProjectOptions>();
         _fileCache = new Dictionary<string, (DateTime, FSharpParseFileResults, FSharpCheckFileResults)>();
+        _symbolUsesCache = new Dictionary<string, (FSharpCheckFileResults, FSharpSymbolUse[])>();
     }
 
     /// <summary>
@@ -113,20 +115,22 @@ public class FSharpWorkspaceManager : IDisposable
                 return (false, null, null, null);
             }
 
-            // Get or read source text
-            var source = sourceText ?? await File.ReadAllTextAsync(filePath);
-            var sourceTextObj = SourceText.ofString(source);
-
-            // Check cache
-            if (_fileCache.TryGetValue(filePath, out var cached))
+            // Check cache before touching the file contents - a pattern
+            // sweep hits this path once per query and should not re-read
+            // the source on every hit
+            if (sourceText == null && _fileCache.TryGetValue(filePath, out var cached))
             {
                 var fileInfo = new FileInfo(filePath);
-                if (cached.timestamp >= fileInfo.LastWriteTime && sourceText == null)
+                if (cached.timestamp >= fileInfo.LastWriteTime)
                 {
                     return (true, cached.parse, cached.check, Array.Empty<FSharpDiagnostic>());
                 }
             }
 
+            // Get or read source text
+            var source = sourceText ?? await File.ReadAllTextAsync(filePath);
+            var sourceTextObj = SourceText.ofString(source);
+
             // Get project options for the file
             var projectOptions = GetProjectOptionsForFile(filePath);
             if (projectOptions == null)
@@ -210,9 +214,24 @@ public class FSharpWorkspaceManager : IDisposable
 
         _logger.LogInformation("FindSymbolsAsync: Parse/check succeeded");
 
-        // Get all symbols in the file
-        var symbolUses = checkResults.GetAllUsesOfAllSymbolsInFile(FSharpOption<System.Threading.CancellationToken>.None);
-        
+        // Get all symbols in the file, reusing the enumeration when the
+        // check results haven't changed. A pattern sweep issues several
+        // queries against the same file; only the filter differs.
+        FSharpSymbolUse[] symbolUses;
+        if (_symbolUsesCache.TryGetValue(filePath, out var cachedUses) &&
+            ReferenceEquals(cachedUses.check, checkResults))
+        {
+            symbolUses = cachedUses.uses;
+        }
+        else
+        {
+            symbolUses = checkResults
+                .GetAllUsesOfAllSymbolsInFile(FSharpOption<System.Threading.CancellationToken>.None)
+                .ToArray();
+            _symbolUsesCache[filePath] = (checkResults, symbolUses);
+        }
+
+
         foreach (var symbolUse in symbolUses)
         {
             if (symbolUse.IsFromDefinition)
@@ -373,6 +392,7 @@ public class FSharpWorkspaceManager : IDisposable
         // FSharpChecker doesn't need explicit disposal
         _projectOptionsCache.Clear();
         _fileCache.Clear();
+        _symbolUsesCache.Clear();
     }
 }
 
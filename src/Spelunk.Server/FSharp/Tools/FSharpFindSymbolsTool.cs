@@ -1,5 +1,6 @@
 using System;
 using System.Linq;
+using System.Text;
 using System.Threading.Tasks;
 using Microsoft.Extensions.Logging;
 
@@ -75,31 +76,34 @@ public class FSharpFindSymbolsTool
                         new
                         {
                             type = "text",
-                            text = $"No symbols found matching pattern '{pattern}'" + 
+                            text = $"No symbols found matching pattern '{pattern}'" +
                                    (kind != null ? $" with kind '{kind}'" : "") +
                                    $" in file {filePath}"
                         }
-                    }
+                    },
+                    count = 0,
+                    symbols = Array.Empty<object>()
                 };
             }
 
-            var result = $"# Found {symbols.Count} F# symbol{(symbols.Count != 1 ? "s" : "")} matching '{pattern}'";
+            var result = new StringBuilder();
+            result.Append($"# Found {symbols.Count} F# symbol{(symbols.Count != 1 ? "s" : "")} matching '{pattern}'");
             if (kind != null)
             {
-                result += $" (kind: {kind})";
+                result.Append($" (kind: {kind})");
             }
-            result += "\n\n";
+            result.Append("\n\n");
 
             foreach (var symbol in symbols.OrderBy(s => s.Name))
             {
-                result += $"## {symbol.Kind}: {symbol.Name}\n";
-                result += $"- **Full Name:** {symbol.FullName}\n";
-                result += $"- **Location:** {symbol.FilePath}:{symbol.StartLine}:{symbol.StartColumn}\n";
+                result.Append($"## {symbol.Kind}: {symbol.Name}\n");
+                result.Append($"- **Full Name:** {symbol.FullName}\n");
+                result.Append($"- **Location:** {symbol.FilePath}:{symbol.StartLine}:{symbol.StartColumn}\n");
                 if (!string.IsNullOrEmpty(symbol.Documentation))
                 {
-                    result += $"- **Documentation:** {symbol.Documentation}\n";
+                    result.Append($"- **Documentation:** {symbol.Documentation}\n");
                 }
-                result += "\n";
+                result.Append('\n');
             }
 
             return new
@@ -109,9 +113,10 @@ public class FSharpFindSymbolsTool
                     new
                     {
                         type = "text",
-                        text = result
+                        text = result.ToString()
                     }
                 },
+                count = symbols.Count,
                 symbols = symbols.Select(s => new
                 {
                     name = s.Name,
@@ -72,14 +72,15 @@ public class McpJsonRpcServer
         }
     }
     
-    public async Task RunAsync(CancellationToken cancellationToken = default)
+    public Task RunAsync(CancellationToken cancellationToken = default)
     {
         _logger.LogInformation("MCP Dotnet Server started - listening on stdio");
-        
-        var reader = Console.In;
-        var writer = Console.Out;
-        
-        // Read JSON-RPC messages from stdin
+        return RunAsync(Console.In, Console.Out, cancellationToken);
+    }
+
+    public async Task RunAsync(TextReader reader, TextWriter writer, CancellationToken cancellationToken = default)
+    {
+        // Read JSON-RPC messages from the reader
         while (!cancellationToken.IsCancellationRequested)
         {
             try
@@ -209,7 +210,8 @@ public class McpJsonRpcServer
                     properties = new
                     {
                         path = new { type = "string", description = "Full path to .sln or .csproj file (relative paths are not supported)" },
-                        workspaceId = new { type = "string", description = "Optional workspace ID (auto-generated if not provided)" }
+                        workspaceId = new { type = "string", description = "Optional workspace ID (auto-generated if not provided)" },
+                        engine = new { type = "string", description = "Optional load engine: 'staticgraph' skips the MSBuild design-time build for C# projects (faster, reduced semantic fidelity)" }
                     },
                     required = new[] { "path" }
                 }
@@ -668,12 +670,47 @@ public class McpJsonRpcServer
                         endLine = new { type = "number", description = "End line of region (1-based)" },
                         endColumn = new { type = "number", description = "End column of region (1-based)" },
                         includeControlFlow = new { type = "boolean", description = "Include control flow analysis (default: true)" },
+                        maxVariableFlows = new { type = "number", description = "Maximum per-variable flow entries to analyze (default: unlimited)" },
                         workspacePath = new { type = "string", description = "Optional workspace path" }
                     },
                     required = new[] { "file", "startLine", "startColumn", "endLine", "endColumn" }
                 }
             },
             new
+            {
+                name = "spelunk-get-data-flow-batch",
+                description = ToolDescriptions.GetDataFlowBatch,
+                inputSchema = new
+                {
+                    type = "object",
+                    properties = new
+                    {
+                        file = new { type = "string", description = "File path to analyze" },
+                        regions = new
+                        {
+                            type = "array",
+                            description = "Regions to analyze, each with 1-based line/column bounds",
+                            items = new
+                            {
+                                type = "object",
+                                properties = new
+                                {
+                                    startLine = new { type = "number", description = "Start line of region (1-based)" },
+                                    startColumn = new { type = "number", description = "Start column of region (1-based)" },
+                                    endLine = new { type = "number", description = "End line of region (1-based)" },
+                                    endColumn = new { type = "number", description = "End column of region (1-based)" }
+                                },
+                                required = new[] { "startLine", "startColumn", "endLine", "endColumn" }
+                            }
+                        },
+                        includeControlFlow = new { type = "boolean", description = "Include control flow analysis (default: true)" },
+                        maxVariableFlows = new { type = "number", description = "Maximum per-variable flow entries to analyze per region (default: unlimited)" },
+                        workspacePath = new { type = "string", description = "Optional workspace path" }
+                    },
+                    required = new[] { "file", "regions" }
+                }
+            },
+            new
             {
                 name = "spelunk-fsharp-projects",
                 description = "Get information about F# projects in the workspace (detected but not loaded by MSBuild)",
@@ -943,7 +980,11 @@ public class McpJsonRpcServer
             case "spelunk-get-data-flow":
                 result = await GetDataFlowAsync(toolCallParams.Arguments);
                 break;
-                
+
+            case "spelunk-get-data-flow-batch":
+                result = await GetDataFlowBatchAsync(toolCallParams.Arguments);
+                break;
+
             case "spelunk-query-syntax":
                 result = await QuerySyntaxAsync(toolCallParams.Arguments);
                 break;
@@ -1172,10 +1213,11 @@ public class McpJsonRpcServer
         }
         
         var workspaceId = args?.TryGetProperty("workspaceId", out var wsId) == true ? wsId.GetString() : null;
+        var engine = args?.TryGetProperty("engine", out var engineElement) == true ? engineElement.GetString() : null;
         
         try
         {
-            var result = await LoadWorkspaceAsync(path, workspaceId);
+            var result = await LoadWorkspaceAsync(path, workspaceId, engine);
             return new
             {
                 content = new[]
@@ -1204,7 +1246,7 @@ public class McpJsonRpcServer
         }
     }
     
-    private async Task<WorkspaceInfo> LoadWorkspaceAsync(string path, string? workspaceId = null)
+    private async Task<WorkspaceInfo> LoadWorkspaceAsync(string path, string? workspaceId = null, string? engine = null)
     {
         // Validate path is allowed
         var fullPath = Path.GetFullPath(path);
@@ -1229,7 +1271,7 @@ public class McpJsonRpcServer
         // Load workspace using Roslyn
         _logger.LogInformation("Loading workspace {Id} from {Path} using Roslyn", workspaceId, path);
         
-        var (success, message, workspace, actualWorkspaceId) = await _workspaceManager.LoadWorkspaceAsync(fullPath, workspaceId);
+        var (success, message, workspace, actualWorkspaceId) = await _workspaceManager.LoadWorkspaceAsync(fullPath, workspaceId, engine);
         
         if (!success || workspace == null)
         {
@@ -3306,11 +3348,15 @@ public class McpJsonRpcServer
             if (args.Value.TryGetProperty("includeControlFlow", out var cfElement))
                 includeControlFlow = cfElement.GetBoolean();
                 
+            int? maxVariableFlows = args.Value.TryGetProperty("maxVariableFlows", out var maxFlowsElement)
+                ? maxFlowsElement.GetInt32()
+                : null;
+
             string? workspaceId = args.Value.TryGetProperty("workspacePath", out var wsPath) ? wsPath.GetString() : null;
             
             // Call the workspace manager
             var result = await _workspaceManager.GetDataFlowAnalysisAsync(
-                filePath, startLine, startColumn, endLine, endColumn, includeControlFlow, workspaceId);
+                filePath, startLine, startColumn, endLine, endColumn, includeControlFlow, workspaceId, maxVariableFlows);
 
             return result.Match(
                 Right: data => (object)new
@@ -3337,7 +3383,88 @@ public class McpJsonRpcServer
             return CreateErrorResponse($"Error getting data flow analysis: {ex.Message}");
         }
     }
-    
+
+    private async Task<object> GetDataFlowBatchAsync(JsonElement? args)
+    {
+        if (args == null)
+            return CreateErrorResponse("No arguments provided");
+
+        try
+        {
+            // Extract required parameters
+            if (!args.Value.TryGetProperty("file", out var fileElement))
+                return CreateErrorResponse("File path is required");
+
+            var filePath = fileElement.GetString();
+            if (string.IsNullOrEmpty(filePath))
+                return CreateErrorResponse("File path cannot be empty");
+
+            if (!args.Value.TryGetProperty("regions", out var regionsElement) ||
+                regionsElement.ValueKind != JsonValueKind.Array)
+                return CreateErrorResponse("Regions array is required");
+
+            var regions = new SCG.List<DataFlowRegion>();
+            foreach (var regionElement in regionsElement.EnumerateArray())
+            {
+                if (!regionElement.TryGetProperty("startLine", out var startLineElement) ||
+                    !regionElement.TryGetProperty("startColumn", out var startColumnElement) ||
+                    !regionElement.TryGetProperty("endLine", out var endLineElement) ||
+                    !regionElement.TryGetProperty("endColumn", out var endColumnElement))
+                    return CreateErrorResponse("Each region requires startLine, startColumn, endLine and endColumn");
+
+                regions.Add(new DataFlowRegion
+                {
+                    StartLine = startLineElement.GetInt32(),
+                    StartColumn = startColumnElement.GetInt32(),
+                    EndLine = endLineElement.GetInt32(),
+                    EndColumn = endColumnElement.GetInt32()
+                });
+            }
+
+            if (regions.Count == 0)
+                return CreateErrorResponse("Regions array cannot be empty");
+
+            // Optional parameters
+            var includeControlFlow = true;
+            if (args.Value.TryGetProperty("includeControlFlow", out var cfElement))
+                includeControlFlow = cfElement.GetBoolean();
+
+            int? maxVariableFlows = args.Value.TryGetProperty("maxVariableFlows", out var maxFlowsElement)
+                ? maxFlowsElement.GetInt32()
+                : null;
+
+            string? workspaceId = args.Value.TryGetProperty("workspacePath", out var wsPath) ? wsPath.GetString() : null;
+
+            // Call the workspace manager; one semantic model serves every region
+            var result = await _workspaceManager.GetDataFlowAnalysisBatchAsync(
+                filePath, regions, includeControlFlow, workspaceId, maxVariableFlows);
+
+            return result.Match(
+                Right: data => (object)new
+                {
+                    content = new[]
+                    {
+                        new
+                        {
+                            type = "text",
+                            text = JsonSerializer.Serialize(data, new JsonSerializerOptions { WriteIndented = true })
+                        }
+                    }
+                },
+                Left: error =>
+                {
+                    _logger.LogWarning("Data flow batch error: {Code} - {Message}", error.Code, error.Message);
+                    return CreateErrorResponse($"Error getting data flow analysis: {error.Message}");
+                }
+            );
+        }
+        catch (Exception ex)
+        {
+            _logger.LogError(ex, "Failed to get batched data flow analysis");
+            return CreateErrorResponse($"Error getting data flow analysis: {ex.Message}");
+        }
+    }
+
     /// <summary>
     /// Synchronize local workspace tracking with DotnetWorkspaceManager
     /// This ensures consistency when workspaces are automatically cleaned up
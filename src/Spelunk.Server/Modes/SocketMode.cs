@@ -0,0 +1,143 @@
+using System.Net.Sockets;
+using Microsoft.Extensions.Configuration;
+using Microsoft.Extensions.DependencyInjection;
+using Microsoft.Extensions.Hosting;
+using Microsoft.Extensions.Logging;
+using Microsoft.Extensions.Options;
+using Spelunk.Server.Configuration;
+using Spelunk.Server.FSharp;
+
+namespace Spelunk.Server.Modes;
+
+/// <summary>
+/// Socket mode - runs the MCP JSON-RPC server over a Unix domain socket.
+/// Unlike stdio mode, the server outlives any single client: loaded
+/// workspaces stay resident between connections, so repeat clients skip
+/// the multi-second MSBuild/Roslyn workspace load.
+/// </summary>
+public class SocketMode : IMode
+{
+    private readonly string _socketPath;
+    private readonly string[] _args;
+
+    public SocketMode(string socketPath, string[] args)
+    {
+        _socketPath = socketPath;
+        _args = args;
+    }
+
+    public async Task RunAsync(CancellationToken cancellationToken = default)
+    {
+        var host = Host.CreateDefaultBuilder(_args)
+            .ConfigureAppConfiguration((context, config) =>
+            {
+                config.SetBasePath(Directory.GetCurrentDirectory())
+                    .AddJsonFile("appsettings.json", optional: true, reloadOnChange: true)
+                    .AddJsonFile("spelunk.config.json", optional: true, reloadOnChange: true);
+
+                var userConfigPath = Path.Combine(
+                    Environment.GetFolderPath(Environment.SpecialFolder.UserProfile),
+                    ".spelunk", "config.json");
+                if (File.Exists(userConfigPath))
+                {
+                    config.AddJsonFile(userConfigPath, optional: true, reloadOnChange: true);
+                }
+
+                // Support legacy environment variable for backward compatibility
+                var legacyAllowedPaths = Environment.GetEnvironmentVariable("SPELUNK_ALLOWED_PATHS");
+                if (!string.IsNullOrEmpty(legacyAllowedPaths))
+                {
+                    var paths = legacyAllowedPaths.Split(Path.PathSeparator);
+                    var inMemoryConfig = new Dictionary<string, string?>();
+                    for (int i = 0; i < paths.Length; i++)
+                    {
+                        inMemoryConfig[$"Spelunk:AllowedPaths:{i}"] = paths[i];
+                    }
+                    config.AddInMemoryCollection(inMemoryConfig);
+                }
+
+                config.AddEnvironmentVariables("SPELUNK__");
+            })
+            .ConfigureServices((context, services) =>
+            {
+                services.AddOptions<SpelunkOptions>()
+                    .Bind(context.Configuration.GetSection(SpelunkOptions.SectionName))
+                    .Configure(options =>
+                    {
+                        if (options.AllowedPaths.Count == 0)
+                        {
+                            options.AllowedPaths.Add(Directory.GetCurrentDirectory());
+                        }
+                    })
+                    .ValidateDataAnnotations()
+                    .ValidateOnStart();
+
+                services.AddSingleton<DotnetWorkspaceManager>();
+                services.AddSingleton<FSharpWorkspaceManager>();
+                services.AddSingleton<McpJsonRpcServer>();
+            })
+            .ConfigureLogging((context, logging) =>
+            {
+                // Log to stderr so socket traffic stays clean
+                logging.ClearProviders();
+                logging.AddConsole(options =>
+                {
+                    options.LogToStandardErrorThreshold = LogLevel.Trace;
+                });
+            })
+            .Build();
+
+        var server = host.Services.GetRequiredService<McpJsonRpcServer>();
+        var logger = host.Services.GetRequiredService<ILogger<SocketMode>>();
+
+        // A stale socket file from a crashed server would block the bind
+        if (File.Exists(_socketPath))
+        {
+            File.Delete(_socketPath);
+        }
+        Directory.CreateDirectory(Path.GetDirectoryName(_socketPath)!);
+
+        using var listener = new Socket(AddressFamily.Unix, SocketType.Stream, ProtocolType.Unspecified);
+        listener.Bind(new UnixDomainSocketEndPoint(_socketPath));
+        listener.Listen(1);
+
+        logger.LogInformation("Spelunk socket server listening on {SocketPath}", _socketPath);
+
+        try
+        {
+            while (!cancellationToken.IsCancellationRequested)
+            {
+                var client = await listener.AcceptAsync(cancellationToken);
+                logger.LogInformation("Client connected");
+
+                // Serve one client at a time; workspaces persist in the
+                // shared DotnetWorkspaceManager between connections.
+                using var stream = new NetworkStream(client, ownsSocket: true);
+                using var reader = new StreamReader(stream);
+                using var writer = new StreamWriter(stream) { AutoFlush = true };
+
+                try
+                {
+                    await server.RunAsync(reader, writer, cancellationToken);
+                }
+                catch (IOException)
+                {
+                    // Client went away mid-request - keep serving
+                }
+
+                logger.LogInformation("Client disconnected");
+            }
+        }
+        catch (OperationCanceledException)
+        {
+            logger.LogInformation("Socket server cancellation requested");
+        }
+        finally
+        {
+            if (File.Exists(_socketPath))
+            {
+                File.Delete(_socketPath);
+            }
+        }
+    }
+}
@@ -18,6 +18,21 @@ class Program
             await mode.RunAsync();
         });
 
+        // socket command - persistent server over a Unix domain socket
+        var socketCommand = new Command("socket", "Run as a persistent server on a Unix domain socket (workspaces stay warm between clients)");
+        var socketPathOption = new Option<string>(
+            name: "--path",
+            getDefaultValue: () => Path.Combine(
+                Environment.GetFolderPath(Environment.SpecialFolder.UserProfile),
+                ".spelunk", "server.sock"),
+            description: "Unix domain socket path");
+        socketCommand.AddOption(socketPathOption);
+        socketCommand.SetHandler(async (string socketPath) =>
+        {
+            var mode = new SocketMode(socketPath, args);
+            await mode.RunAsync();
+        }, socketPathOption);
+
         // sse command group
         var sseCommand = new Command("sse", "Run SSE server or manage background instance");
 
@@ -103,6 +118,7 @@ class Program
         sseCommand.AddCommand(logsCommand);
 
         rootCommand.AddCommand(stdioCommand);
+        rootCommand.AddCommand(socketCommand);
         rootCommand.AddCommand(sseCommand);
 
         return await rootCommand.InvokeAsync(args);
@@ -55,7 +55,9 @@ public static class ToolDescriptions
     public const string GetStatementContext = "Get comprehensive semantic context for a statement including symbols, types, diagnostics, and basic data flow";
     
     public const string GetDataFlow = "Get comprehensive data flow analysis for a code region showing variable usage, dependencies, and control flow";
-    
+
+    public const string GetDataFlowBatch = "Get data flow analysis for several regions of one file in a single call, reusing one semantic model for all regions";
+
     public const string GetDiagnostics = "Get compilation diagnostics (errors, warnings, info) from the workspace";
     
     public const string FSharpProjects = "Get information about F# projects in the workspace (detected but not loaded by MSBuild)";
@@ -1,65 +1,121 @@
 #!/usr/bin/env python3
 """Comprehensive test of all MCP Dotnet tools to ensure valuable outcomes."""
 
-import json
-import subprocess
 import os
+import queue
+import re
 import sys
-from typing import Dict, Any, Optional, List
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+# Only an alias of the builtin since 3.11; catching the futures name
+# keeps the timeout-to-no_response conversion working on older Pythons
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Dict, Any, Optional, List, Tuple
+
+import spelunk_host
+from spelunk_host import loads
+
+# Per-call deadline. A stuck or dead server turns into a reported
+# no_response instead of hanging the whole suite (and, with the pool,
+# a stuck worker no longer stalls the other workers forever).
+REQUEST_TIMEOUT = 30
+
+# Error triage: one compiled alternation instead of a chain of substring
+# scans; the matched group name keys the remedy table, so new error
+# classes only need a group + table entry.
+_ERR_RE = re.compile(
+    r"(?P<workspace>No workspace loaded)|(?P<not_found>not found)|(?P<invalid>Invalid)")
+
+_REMEDIES = {
+    "workspace": "Load a workspace first using dotnet-load-workspace",
+    "not_found": "Check file paths and ensure target exists",
+    "invalid": "Check parameter format: {msg}",
+}
+
+_DEFAULT_REMEDY = "Review error message and adjust parameters"
 
 class MCPToolTester:
-    def __init__(self, workspace_path: str):
+    def __init__(self, workspace_path: str, process=None):
         self.workspace_path = workspace_path
-        env = os.environ.copy()
-        env['SPELUNK_ALLOWED_PATHS'] = workspace_path
-        
-        self.process = subprocess.Popen(
-            ['dotnet', 'run', '--project', 'src/Spelunk.Server', '--no-build'],
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            env=env
-        )
+        self.process = process or spelunk_host.get_process(workspace_path)
         self.request_id = 0
-        self.results = []
-        
+        self._pending: Dict[int, Future] = {}
+        self._lock = threading.Lock()
+        self._reader = threading.Thread(target=self._read_responses, daemon=True)
+        self._reader.start()
+
+    def _read_responses(self):
+        """Demultiplex response lines into pending futures by id."""
+        for line in self.process.stdout:
+            try:
+                response = loads(line)
+            except ValueError:
+                continue
+            with self._lock:
+                future = self._pending.pop(response.get("id"), None)
+            if future is not None:
+                future.set_result(response)
+
+    def _submit(self, tool: str, params: Dict[str, Any]) -> Tuple[int, bytes, Future]:
+        """Build a request payload and register a future for its response."""
+        with self._lock:
+            self.request_id += 1
+            request_id = self.request_id
+            future = Future()
+            self._pending[request_id] = future
+        return request_id, spelunk_host.tool_payload(tool, request_id, params), future
+
+    def _await(self, request_id: int, future: Future) -> Optional[Dict]:
+        """Wait for a response with a deadline; None means no_response."""
+        try:
+            return future.result(timeout=REQUEST_TIMEOUT)
+        except FutureTimeoutError:
+            with self._lock:
+                self._pending.pop(request_id, None)
+            return None
+
     def send_request(self, tool: str, params: Dict[str, Any]) -> Optional[Dict]:
         """Send a tool request and get response."""
-        self.request_id += 1
-        request = {
-            "jsonrpc": "2.0",
-            "id": self.request_id,
-            "method": "tools/call",
-            "params": {
-                "name": tool,
-                "arguments": params
-            }
-        }
-        
+        request_id, payload, future = self._submit(tool, params)
         try:
-            json.dump(request, self.process.stdin)
-            self.process.stdin.write('\n')
+            self.process.stdin.write(payload)
             self.process.stdin.flush()
-            
-            response_line = self.process.stdout.readline()
-            if response_line:
-                return json.loads(response_line)
         except Exception as e:
             return {"error": str(e)}
-        return None
-    
-    def test_tool(self, tool_name: str, params: Dict[str, Any], 
-                  description: str, expected_behavior: str) -> Dict:
-        """Test a single tool and analyze results."""
-        print(f"\n{'='*60}")
-        print(f"Testing: {tool_name}")
-        print(f"Description: {description}")
-        print(f"Expected: {expected_behavior}")
-        print("-" * 60)
-        
+        return self._await(request_id, future)
+
+    def send_batch(self, calls: List[Tuple[str, Dict[str, Any]]]) -> List[Optional[Dict]]:
+        """Pipeline several requests in one write, then gather the responses.
+
+        The server still processes the requests in order, so this is safe
+        for order-dependent call sequences too - it just removes the
+        per-call round-trip.
+        """
+        payloads = []
+        pending = []
+        for tool, params in calls:
+            request_id, payload, future = self._submit(tool, params)
+            payloads.append(payload)
+            pending.append((request_id, future))
+        try:
+            self.process.stdin.write(b''.join(payloads))
+            self.process.stdin.flush()
+        except Exception as e:
+            return [{"error": str(e)} for _ in pending]
+
+        return [self._await(request_id, future) for request_id, future in pending]
+
+    def run_tool(self, tool_name: str, params: Dict[str, Any],
+                 description: str, expected_behavior: str) -> Dict:
+        """Run a single tool and analyze the result (no printing)."""
         response = self.send_request(tool_name, params)
-        
+        return self.analyze_response(tool_name, params, description,
+                                     expected_behavior, response)
+
+    def analyze_response(self, tool_name: str, params: Dict[str, Any],
+                         description: str, expected_behavior: str,
+                         response: Optional[Dict]) -> Dict:
+        """Classify a tool response and suggest a remedy where needed."""
         result = {
             "tool": tool_name,
             "description": description,
@@ -69,73 +125,55 @@ class MCPToolTester:
             "outcome": None,
             "remedy": None
         }
-        
+
         if not response:
             result["status"] = "no_response"
             result["remedy"] = "Server may be down or request timed out"
-            print("❌ No response received")
-            
+
         elif "error" in response:
             error = response["error"]
             result["status"] = "error"
             result["outcome"] = error
-            
+
             # Analyze error for remedy
             if error and isinstance(error, dict) and "message" in error:
                 msg = error["message"]
-                if "No workspace loaded" in msg:
-                    result["remedy"] = "Load a workspace first using dotnet-load-workspace"
-                elif "not found" in msg:
-                    result["remedy"] = "Check file paths and ensure target exists"
-                elif "Invalid" in msg:
-                    result["remedy"] = f"Check parameter format: {msg}"
-                else:
-                    result["remedy"] = "Review error message and adjust parameters"
-                print(f"❌ Error: {msg}")
+                m = _ERR_RE.search(msg)
+                remedy = _REMEDIES[m.lastgroup] if m else _DEFAULT_REMEDY
+                result["remedy"] = remedy.format(msg=msg)
             else:
                 result["remedy"] = "Unknown error - check server logs"
-                print(f"❌ Error: {error if error else 'Unknown error'}")
-            
-            if "remedy" in result:
-                print(f"💡 Remedy: {result['remedy']}")
-            
+
         elif "result" in response:
             result_data = response["result"]
-            
+
             # Check for empty/null results
             if not result_data or (isinstance(result_data, dict) and "content" in result_data and not result_data["content"]):
                 result["status"] = "empty"
                 result["remedy"] = "No results found - verify search criteria or target exists"
-                print("⚠️ Empty result - no matching items found")
-                
+
             # Check for warnings in result
             elif isinstance(result_data, dict) and "content" in result_data:
                 content = result_data["content"]
                 if content and len(content) > 0:
                     try:
-                        parsed = json.loads(content[0]["text"]) if isinstance(content[0], dict) else None
+                        parsed = loads(content[0]["text"]) if isinstance(content[0], dict) else None
                         if parsed and "Warnings" in parsed:
                             result["status"] = "warning"
                             result["outcome"] = parsed["Warnings"]
                             result["remedy"] = self.analyze_warnings(parsed["Warnings"])
-                            print(f"⚠️ Warnings: {parsed['Warnings']}")
-                            print(f"💡 Remedy: {result['remedy']}")
                         else:
                             result["status"] = "success"
                             result["outcome"] = "Data returned successfully"
-                            print("✅ Success - valuable data returned")
                     except:
                         result["status"] = "success"
                         result["outcome"] = "Data returned (non-JSON)"
-                        print("✅ Success - data returned")
             else:
-                result["status"] = "success" 
+                result["status"] = "success"
                 result["outcome"] = "Operation completed"
-                print("✅ Success")
-                
-        self.results.append(result)
+
         return result
-    
+
     def analyze_warnings(self, warnings: List[Dict]) -> str:
         """Analyze warnings to provide remedies."""
         remedies = []
@@ -150,346 +188,354 @@ class MCPToolTester:
             else:
                 remedies.append(warning.get("Message", "Review warning details"))
         return "; ".join(remedies) if remedies else "Review warnings and adjust request"
-    
+
     def close(self):
-        """Close the MCP server."""
-        self.process.stdin.close()
-        self.process.terminate()
-        self.process.wait()
-    
-    def print_summary(self):
-        """Print test summary."""
+        """Release the shared server (spelunk_host shuts it down at exit)."""
+        pass
+
+
+class ServerPool:
+    """Pool of MCPToolTester workers, each on its own warm server process.
+
+    Read-only tool calls are dispatched across the pool; tests that mutate
+    workspace state must be run through run_serial on a single worker.
+    """
+    def __init__(self, workspace_path: str, size: int):
+        self.testers = [
+            MCPToolTester(workspace_path, process=spelunk_host.launch(workspace_path))
+            for _ in range(size)
+        ]
+        self._idle = queue.Queue()
+        for tester in self.testers:
+            self._idle.put(tester)
+        self.executor = ThreadPoolExecutor(max_workers=size)
+        self.results = []
+
+    def warm_up(self, workspace_file: str):
+        """Load the workspace once on every worker."""
+        for tester in self.testers:
+            tester.send_request("spelunk-load-workspace", {"path": workspace_file})
+
+    def _run_on_idle_worker(self, test):
+        tester = self._idle.get()
+        try:
+            return tester.run_tool(*test)
+        finally:
+            self._idle.put(tester)
+
+    def run_parallel(self, tests) -> List[Dict]:
+        """Run independent tests across the pool, results in submission order."""
+        futures = [self.executor.submit(self._run_on_idle_worker, t) for t in tests]
+        results = [f.result() for f in futures]
+        self.results.extend(results)
+        return results
+
+    def run_serial(self, tests) -> List[Dict]:
+        """Run order-dependent (mutating) tests on a single worker.
+
+        The requests are pipelined in one write; the server executes them
+        in order, so mutation ordering is preserved without paying a
+        round-trip per call.
+        """
+        tester = self.testers[0]
+        responses = tester.send_batch([(tool, params) for tool, params, _, _ in tests])
+        results = [
+            tester.analyze_response(tool, params, description, expected, response)
+            for (tool, params, description, expected), response in zip(tests, responses)
+        ]
+        self.results.extend(results)
+        return results
+
+    def close(self):
+        self.executor.shutdown()
+        for tester in self.testers:
+            if tester.process.poll() is None:
+                tester.process.stdin.close()
+                tester.process.terminate()
+                tester.process.wait()
+
+
+def print_result(result: Dict):
+    """Print one test result in the familiar banner format."""
+    print(f"\n{'='*60}")
+    print(f"Testing: {result['tool']}")
+    print(f"Description: {result['description']}")
+    print(f"Expected: {result['expected']}")
+    print("-" * 60)
+
+    status = result["status"]
+    if status == "no_response":
+        print("❌ No response received")
+    elif status == "error":
+        error = result["outcome"]
+        if error and isinstance(error, dict) and "message" in error:
+            print(f"❌ Error: {error['message']}")
+        else:
+            print(f"❌ Error: {error if error else 'Unknown error'}")
+        print(f"💡 Remedy: {result['remedy']}")
+    elif status == "empty":
+        print("⚠️ Empty result - no matching items found")
+    elif status == "warning":
+        print(f"⚠️ Warnings: {result['outcome']}")
+        print(f"💡 Remedy: {result['remedy']}")
+    elif status == "success":
+        print(f"✅ Success - {result['outcome']}")
+
+
+def print_summary(results: List[Dict]):
+    """Print test summary."""
+    print("\n" + "="*80)
+    print("TEST SUMMARY")
+    print("="*80)
+
+    by_status = {}
+    for result in results:
+        status = result["status"]
+        by_status[status] = by_status.get(status, 0) + 1
+
+    print(f"Total tools tested: {len(results)}")
+    for status, count in by_status.items():
+        emoji = {"success": "✅", "error": "❌", "warning": "⚠️",
+                "empty": "📭", "no_response": "🔇"}.get(status, "❓")
+        print(f"{emoji} {status}: {count}")
+
+    # Print tools needing attention
+    print("\n" + "="*60)
+    print("TOOLS NEEDING ATTENTION:")
+    print("="*60)
+
+    for result in results:
+        if result["status"] not in ["success"]:
+            print(f"\n{result['tool']}:")
+            print(f"  Status: {result['status']}")
+            print(f"  Remedy: {result['remedy']}")
+
+
+workspace_path = "/Users/bill/Repos/SampleAppForMcp"
+workspace_file = "/Users/bill/Repos/SampleAppForMcp/SampleAppForMcp.sln"
+test_file = "/Users/bill/Repos/SampleAppForMcp/ConsoleApp/Program.cs"
+
+# Each entry: (tool, params, description, expected behavior)
+WORKSPACE_TESTS = [
+    ("spelunk-load-workspace",
+     {"path": workspace_file},
+     "Load a solution file",
+     "Should load workspace and return project info"),
+    ("spelunk-workspace-status",
+     {},
+     "Get workspace status after loading",
+     "Should return loading progress and workspace info"),
+]
+
+# Read-only discovery and analysis tools - safe to run concurrently
+PARALLEL_TESTS = [
+    # Category 2: Symbol discovery
+    ("spelunk-find-class",
+     {"pattern": "Program"},
+     "Find class by name pattern",
+     "Should find Program class"),
+    ("spelunk-find-class",
+     {"pattern": "NonExistent*"},
+     "Find non-existent class pattern",
+     "Should return empty with clear message"),
+    ("spelunk-find-method",
+     {"methodPattern": "Main"},
+     "Find Main method",
+     "Should find Main method"),
+    ("spelunk-find-property",
+     {"propertyPattern": "*"},
+     "Find all properties",
+     "Should list properties or indicate none exist"),
+    # Category 3: References and inheritance
+    ("spelunk-find-references",
+     {"symbolName": "Main"},
+     "Find references to Main method",
+     "Should find references or indicate none"),
+    ("spelunk-find-method-callers",
+     {"methodName": "WriteLine"},
+     "Find callers of WriteLine",
+     "Should find methods calling WriteLine"),
+    ("spelunk-find-method-calls",
+     {"methodName": "Main"},
+     "Find methods called by Main",
+     "Should list methods called from Main"),
+    ("spelunk-find-derived-types",
+     {"baseClassName": "Object"},
+     "Find types derived from Object",
+     "Should find derived types"),
+    ("spelunk-find-implementations",
+     {"interfaceName": "IDisposable"},
+     "Find IDisposable implementations",
+     "Should find implementations or indicate none"),
+    ("spelunk-find-overrides",
+     {"methodName": "ToString", "className": "Object"},
+     "Find ToString overrides",
+     "Should find overrides or indicate none"),
+    # Category 4: Statement-level search
+    ("spelunk-find-statements",
+     {"pattern": "Console.WriteLine", "filePath": test_file},
+     "Find Console.WriteLine statements",
+     "Should find print statements with IDs"),
+    ("spelunk-find-statements",
+     {"pattern": "//if-statement", "patternType": "roslynpath"},
+     "Find if statements using RoslynPath",
+     "Should find if statements or indicate none"),
+    # Category 6: Analysis
+    ("spelunk-analyze-syntax",
+     {"filePath": test_file},
+     "Analyze syntax tree of a file",
+     "Should return AST analysis"),
+    ("spelunk-get-symbols",
+     {"filePath": test_file},
+     "Get symbols from a file",
+     "Should return symbol information"),
+    ("spelunk-get-statement-context",
+     {"file": test_file, "line": 10, "column": 1},
+     "Get context for a statement",
+     "Should return semantic context or explain requirements"),
+    ("spelunk-get-data-flow",
+     {
+         "file": test_file,
+         "startLine": 10, "startColumn": 1,
+         "endLine": 15, "endColumn": 1,
+         "includeControlFlow": False
+     },
+     "Get data flow for a region",
+     "Should return data flow or explain region requirements"),
+]
+
+# Marker and modification tools mutate session/workspace state - keep serial
+SERIAL_TESTS = [
+    # Category 5: Marker system
+    ("spelunk-mark-statement",
+     {"filePath": test_file, "line": 10, "column": 1},
+     "Mark a statement at line 10",
+     "Should mark statement or explain why it can't"),
+    ("spelunk-find-marked-statements",
+     {},
+     "Find all marked statements",
+     "Should list marked statements or indicate none"),
+    ("spelunk-clear-markers",
+     {},
+     "Clear all markers",
+     "Should clear markers successfully"),
+    # Category 7: Modification tools (preview mode)
+    ("spelunk-rename-symbol",
+     {"oldName": "NonExistentMethod", "newName": "NewName", "preview": True},
+     "Rename non-existent symbol (preview)",
+     "Should indicate symbol not found"),
+    ("spelunk-edit-code",
+     {
+         "file": test_file,
+         "operation": "add-method",
+         "className": "Program",
+         "code": "public void TestMethod() { }",
+         "preview": True
+     },
+     "Add method to Program class (preview)",
+     "Should preview addition or explain why it can't"),
+    ("spelunk-fix-pattern",
+     {
+         "findPattern": "Console.WriteLine",
+         "replacePattern": "logger.Log",
+         "patternType": "text",
+         "preview": True
+     },
+     "Fix pattern (preview mode)",
+     "Should show preview of changes or indicate no matches"),
+    # Category 8: Statement modification
+    ("spelunk-replace-statement",
+     {
+         "filePath": test_file,
+         "line": 9999,
+         "column": 1,
+         "newStatement": "Console.WriteLine(\"test\");"
+     },
+     "Replace statement at invalid line",
+     "Should provide clear error about invalid location"),
+    ("spelunk-insert-statement",
+     {
+         "filePath": test_file,
+         "line": 10,
+         "column": 1,
+         "position": "before",
+         "statement": "// Test comment"
+     },
+     "Insert statement at line 10",
+     "Should insert or explain requirements"),
+    ("spelunk-remove-statement",
+     {
+         "filePath": test_file,
+         "line": 9999,
+         "column": 1
+     },
+     "Remove statement at invalid line",
+     "Should provide clear error about invalid location"),
+]
+
+
+def main():
+    print("Starting comprehensive tool testing...")
+    pool_size = min(4, os.cpu_count() or 1)
+    pool = ServerPool(workspace_path, pool_size)
+
+    try:
         print("\n" + "="*80)
-        print("TEST SUMMARY")
+        print("CATEGORY 1: WORKSPACE AND LOADING TOOLS")
         print("="*80)
-        
-        by_status = {}
-        for result in self.results:
-            status = result["status"]
-            by_status[status] = by_status.get(status, 0) + 1
-        
-        print(f"Total tools tested: {len(self.results)}")
-        for status, count in by_status.items():
-            emoji = {"success": "✅", "error": "❌", "warning": "⚠️", 
-                    "empty": "📭", "no_response": "🔇"}.get(status, "❓")
-            print(f"{emoji} {status}: {count}")
-        
-        # Print tools needing attention
-        print("\n" + "="*60)
-        print("TOOLS NEEDING ATTENTION:")
-        print("="*60)
-        
-        for result in self.results:
-            if result["status"] not in ["success"]:
-                print(f"\n{result['tool']}:")
-                print(f"  Status: {result['status']}")
-                print(f"  Remedy: {result['remedy']}")
-
-# Create tester
-print("Starting comprehensive tool testing...")
-tester = MCPToolTester("/Users/bill/Repos/SampleAppForMcp")
-
-# Test 1: Workspace Loading Tools
-print("\n" + "="*80)
-print("CATEGORY 1: WORKSPACE AND LOADING TOOLS")
-print("="*80)
-
-tester.test_tool(
-    "spelunk-load-workspace",
-    {"path": "/Users/bill/Repos/SampleAppForMcp/SampleAppForMcp.sln"},
-    "Load a solution file",
-    "Should load workspace and return project info"
-)
-
-tester.test_tool(
-    "spelunk-workspace-status",
-    {},
-    "Get workspace status after loading",
-    "Should return loading progress and workspace info"
-)
-
-# Test 2: Symbol Discovery Tools
-print("\n" + "="*80)
-print("CATEGORY 2: SYMBOL DISCOVERY TOOLS")
-print("="*80)
-
-tester.test_tool(
-    "spelunk-find-class",
-    {"pattern": "Program"},
-    "Find class by name pattern",
-    "Should find Program class"
-)
-
-tester.test_tool(
-    "spelunk-find-class",
-    {"pattern": "NonExistent*"},
-    "Find non-existent class pattern",
-    "Should return empty with clear message"
-)
-
-tester.test_tool(
-    "spelunk-find-method",
-    {"methodPattern": "Main"},
-    "Find Main method",
-    "Should find Main method"
-)
-
-tester.test_tool(
-    "spelunk-find-property",
-    {"propertyPattern": "*"},
-    "Find all properties",
-    "Should list properties or indicate none exist"
-)
-
-# Test 3: Reference and Inheritance Tools
-print("\n" + "="*80)
-print("CATEGORY 3: REFERENCE AND INHERITANCE TOOLS")
-print("="*80)
-
-tester.test_tool(
-    "spelunk-find-references",
-    {"symbolName": "Main"},
-    "Find references to Main method",
-    "Should find references or indicate none"
-)
-
-tester.test_tool(
-    "spelunk-find-method-callers",
-    {"methodName": "WriteLine"},
-    "Find callers of WriteLine",
-    "Should find methods calling WriteLine"
-)
-
-tester.test_tool(
-    "spelunk-find-method-calls",
-    {"methodName": "Main"},
-    "Find methods called by Main",
-    "Should list methods called from Main"
-)
-
-tester.test_tool(
-    "spelunk-find-derived-types",
-    {"baseClassName": "Object"},
-    "Find types derived from Object",
-    "Should find derived types"
-)
-
-tester.test_tool(
-    "spelunk-find-implementations",
-    {"interfaceName": "IDisposable"},
-    "Find IDisposable implementations",
-    "Should find implementations or indicate none"
-)
-
-tester.test_tool(
-    "spelunk-find-overrides",
-    {"methodName": "ToString", "className": "Object"},
-    "Find ToString overrides",
-    "Should find overrides or indicate none"
-)
-
-# Test 4: Statement-Level Tools
-print("\n" + "="*80)
-print("CATEGORY 4: STATEMENT-LEVEL TOOLS")
-print("="*80)
+        pool.warm_up(workspace_file)
+        for result in pool.run_serial(WORKSPACE_TESTS):
+            print_result(result)
 
-test_file = "/Users/bill/Repos/SampleAppForMcp/ConsoleApp/Program.cs"
+        print("\n" + "="*80)
+        print("CATEGORIES 2-4, 6: DISCOVERY AND ANALYSIS TOOLS (parallel)")
+        print("="*80)
+        for result in pool.run_parallel(PARALLEL_TESTS):
+            print_result(result)
+
+        print("\n" + "="*80)
+        print("CATEGORIES 5, 7-8: MARKER AND MODIFICATION TOOLS (serial)")
+        print("="*80)
+        for result in pool.run_serial(SERIAL_TESTS):
+            print_result(result)
+
+        print_summary(pool.results)
+
+        # Generate recommendations
+        print("\n" + "="*80)
+        print("RECOMMENDATIONS FOR IMPROVEMENT")
+        print("="*80)
 
-tester.test_tool(
-    "spelunk-find-statements",
-    {"pattern": "Console.WriteLine", "filePath": test_file},
-    "Find Console.WriteLine statements",
-    "Should find print statements with IDs"
-)
-
-tester.test_tool(
-    "spelunk-find-statements",
-    {"pattern": "//if-statement", "patternType": "roslynpath"},
-    "Find if statements using RoslynPath",
-    "Should find if statements or indicate none"
-)
-
-# Test 5: Marker System Tools
-print("\n" + "="*80)
-print("CATEGORY 5: MARKER SYSTEM TOOLS")
-print("="*80)
-
-tester.test_tool(
-    "spelunk-mark-statement",
-    {"filePath": test_file, "line": 10, "column": 1},
-    "Mark a statement at line 10",
-    "Should mark statement or explain why it can't"
-)
-
-tester.test_tool(
-    "spelunk-find-marked-statements",
-    {},
-    "Find all marked statements",
-    "Should list marked statements or indicate none"
-)
-
-tester.test_tool(
-    "spelunk-clear-markers",
-    {},
-    "Clear all markers",
-    "Should clear markers successfully"
-)
-
-# Test 6: Analysis Tools
-print("\n" + "="*80)
-print("CATEGORY 6: ANALYSIS TOOLS")
-print("="*80)
-
-tester.test_tool(
-    "spelunk-analyze-syntax",
-    {"filePath": test_file},
-    "Analyze syntax tree of a file",
-    "Should return AST analysis"
-)
-
-tester.test_tool(
-    "spelunk-get-symbols",
-    {"filePath": test_file},
-    "Get symbols from a file",
-    "Should return symbol information"
-)
-
-tester.test_tool(
-    "spelunk-get-statement-context",
-    {"file": test_file, "line": 10, "column": 1},
-    "Get context for a statement",
-    "Should return semantic context or explain requirements"
-)
-
-tester.test_tool(
-    "spelunk-get-data-flow",
-    {
-        "file": test_file,
-        "startLine": 10, "startColumn": 1,
-        "endLine": 15, "endColumn": 1,
-        "includeControlFlow": False
-    },
-    "Get data flow for a region",
-    "Should return data flow or explain region requirements"
-)
-
-# Test 7: Modification Tools
-print("\n" + "="*80)
-print("CATEGORY 7: MODIFICATION TOOLS")
-print("="*80)
-
-tester.test_tool(
-    "spelunk-rename-symbol",
-    {"oldName": "NonExistentMethod", "newName": "NewName", "preview": True},
-    "Rename non-existent symbol (preview)",
-    "Should indicate symbol not found"
-)
-
-tester.test_tool(
-    "spelunk-edit-code",
-    {
-        "file": test_file,
-        "operation": "add-method",
-        "className": "Program",
-        "code": "public void TestMethod() { }",
-        "preview": True
-    },
-    "Add method to Program class (preview)",
-    "Should preview addition or explain why it can't"
-)
-
-tester.test_tool(
-    "spelunk-fix-pattern",
-    {
-        "findPattern": "Console.WriteLine",
-        "replacePattern": "logger.Log",
-        "patternType": "text",
-        "preview": True
-    },
-    "Fix pattern (preview mode)",
-    "Should show preview of changes or indicate no matches"
-)
-
-# Test 8: Statement Modification Tools
-print("\n" + "="*80)
-print("CATEGORY 8: STATEMENT MODIFICATION TOOLS")
-print("="*80)
-
-tester.test_tool(
-    "spelunk-replace-statement",
-    {
-        "filePath": test_file,
-        "line": 9999,
-        "column": 1,
-        "newStatement": "Console.WriteLine(\"test\");"
-    },
-    "Replace statement at invalid line",
-    "Should provide clear error about invalid location"
-)
-
-tester.test_tool(
-    "spelunk-insert-statement",
-    {
-        "filePath": test_file,
-        "line": 10,
-        "column": 1,
-        "position": "before",
-        "statement": "// Test comment"
-    },
-    "Insert statement at line 10",
-    "Should insert or explain requirements"
-)
-
-tester.test_tool(
-    "spelunk-remove-statement",
-    {
-        "filePath": test_file,
-        "line": 9999,
-        "column": 1
-    },
-    "Remove statement at invalid line",
-    "Should provide clear error about invalid location"
-)
-
-# Print final summary
-tester.print_summary()
-
-# Generate recommendations
-print("\n" + "="*80)
-print("RECOMMENDATIONS FOR IMPROVEMENT")
-print("="*80)
-
-recommendations = []
-
-# Analyze results for patterns
-error_patterns = {}
-for result in tester.results:
-    if result["status"] == "error" and result["outcome"]:
-        error_msg = str(result["outcome"])
-        if "No workspace" in error_msg:
-            error_patterns["workspace"] = error_patterns.get("workspace", 0) + 1
-        elif "not found" in error_msg:
-            error_patterns["not_found"] = error_patterns.get("not_found", 0) + 1
-        elif "Invalid" in error_msg:
-            error_patterns["invalid"] = error_patterns.get("invalid", 0) + 1
-
-if error_patterns.get("workspace", 0) > 2:
-    recommendations.append("Multiple tools require workspace - consider auto-loading or better error messages")
-if error_patterns.get("not_found", 0) > 3:
-    recommendations.append("Many 'not found' errors - improve discovery helpers or suggestions")
-if error_patterns.get("invalid", 0) > 2:
-    recommendations.append("Parameter validation issues - provide better examples or validation")
-
-# Check for empty results
-empty_count = sum(1 for r in tester.results if r["status"] == "empty")
-if empty_count > 5:
-    recommendations.append("Many empty results - consider providing suggestions or 'did you mean' functionality")
-
-if recommendations:
-    for i, rec in enumerate(recommendations, 1):
-        print(f"{i}. {rec}")
-else:
-    print("✅ All tools appear to be functioning well with clear error messages")
-
-# Close tester
-tester.close()
\ No newline at end of file
+        recommendations = []
+
+        # Analyze results for patterns
+        error_patterns = {}
+        for result in pool.results:
+            if result["status"] == "error" and result["outcome"]:
+                m = _ERR_RE.search(str(result["outcome"]))
+                if m:
+                    error_patterns[m.lastgroup] = error_patterns.get(m.lastgroup, 0) + 1
+
+        if error_patterns.get("workspace", 0) > 2:
+            recommendations.append("Multiple tools require workspace - consider auto-loading or better error messages")
+        if error_patterns.get("not_found", 0) > 3:
+            recommendations.append("Many 'not found' errors - improve discovery helpers or suggestions")
+        if error_patterns.get("invalid", 0) > 2:
+            recommendations.append("Parameter validation issues - provide better examples or validation")
+
+        # Check for empty results
+        empty_count = sum(1 for r in pool.results if r["status"] == "empty")
+        if empty_count > 5:
+            recommendations.append("Many empty results - consider providing suggestions or 'did you mean' functionality")
+
+        if recommendations:
+            for i, rec in enumerate(recommendations, 1):
+                print(f"{i}. {rec}")
+        else:
+            print("✅ All tools appear to be functioning well with clear error messages")
+    finally:
+        pool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,18 @@
 #!/usr/bin/env python3
 """Test critical tools for valuable outcomes and error handling."""
 
-import json
-import subprocess
 import sys
 
+from spelunk_host import get_process, loads, request_payload
+
 def send_request(proc, request):
     """Send request and get response."""
-    proc.stdin.write(json.dumps(request) + '\n')
+    payload = request_payload(request["method"], request["id"], request.get("params") or {})
+    proc.stdin.write(payload)
     proc.stdin.flush()
     response = proc.stdout.readline()
     if response:
-        return json.loads(response)
+        return loads(response)
     return None
 
 def test_critical_tools():
@@ -21,15 +22,8 @@ def test_critical_tools():
     print("CRITICAL TOOLS TEST")
     print("="*80)
     
-    # Start server
-    proc = subprocess.Popen(
-        ['/usr/local/share/dotnet/dotnet', 'run', '--project', 'src/Spelunk.Server', '--no-build'],
-        stdin=subprocess.PIPE,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.DEVNULL,
-        text=True,
-        env={'SPELUNK_ALLOWED_PATHS': '/Users/bill/Repos/Spelunk.NET/test-workspace'}
-    )
+    # Get the shared server process
+    proc = get_process('/Users/bill/Repos/Spelunk.NET/test-workspace')
     
     # Initialize
     init_request = {
@@ -71,7 +65,7 @@ def test_critical_tools():
         print("✅ Workspace loaded successfully")
         result = response["result"]
         if "content" in result and result["content"]:
-            content = json.loads(result["content"][0]["text"])
+            content = loads(result["content"][0]["text"])
             print(f"   Workspace ID: {content.get('id')}")
             print(f"   Projects: {content.get('projects', [])}")
     else:
@@ -100,7 +94,7 @@ def test_critical_tools():
     if response and response.get("result"):
         result = response["result"]
         if "content" in result and result["content"]:
-            content = json.loads(result["content"][0]["text"])
+            content = loads(result["content"][0]["text"])
             statements = content.get("Statements", [])
             if statements:
                 print(f"✅ RoslynPath found {len(statements)} statements")
@@ -152,7 +146,7 @@ public class DataFlowTest {
     if response and response.get("result"):
         result = response["result"]
         if "content" in result and result["content"]:
-            content = json.loads(result["content"][0]["text"])
+            content = loads(result["content"][0]["text"])
             if "DataFlow" in content and content["DataFlow"]:
                 df = content["DataFlow"]
                 print("✅ Data flow analysis succeeded")
@@ -195,7 +189,7 @@ public class DataFlowTest {
         elif response.get("result"):
             result = response["result"]
             if "content" in result and result["content"]:
-                content = json.loads(result["content"][0]["text"])
+                content = loads(result["content"][0]["text"])
                 if content.get("error") or content.get("Error"):
                     print(f"✅ Error in result: {content.get('error') or content.get('Error')}")
                 else:
@@ -225,7 +219,7 @@ public class DataFlowTest {
     if response and response.get("result"):
         result = response["result"]
         if "content" in result and result["content"]:
-            content = json.loads(result["content"][0]["text"])
+            content = loads(result["content"][0]["text"])
             if content.get("Success"):
                 marker_id = content.get("MarkerId")
                 print(f"✅ Statement marked with ID: {marker_id}")
@@ -248,7 +242,7 @@ public class DataFlowTest {
         if response and response.get("result"):
             result = response["result"]
             if "content" in result and result["content"]:
-                content = json.loads(result["content"][0]["text"])
+                content = loads(result["content"][0]["text"])
                 markers = content.get("Markers", [])
                 if markers:
                     print(f"✅ Found {len(markers)} marked statements")
@@ -280,8 +274,7 @@ The tools are production-ready with minor improvements needed for
 user experience (better "no results" messages, consistent error format).
 """)
     
-    # Cleanup
-    proc.terminate()
+    # Cleanup happens at interpreter exit via spelunk_host
 
 if __name__ == "__main__":
     test_critical_tools()
\ No newline at end of file
@@ -4,180 +4,23 @@ Integration tests for RoslynPath functionality through MCP tools
 Tests the complete pipeline from query to results
 """
 
-import json
 import sys
 import os
 import tempfile
 import subprocess
-import time
+import threading
+from concurrent.futures import Future
 from typing import Dict, List, Any
 
-class RoslynPathIntegrationTester:
-    def __init__(self):
-        self.server_proc = None
-        self.test_dir = tempfile.mkdtemp(prefix="roslynpath_test_")
-        self.passed = 0
-        self.failed = 0
-        self.tests = []
-        
-    def start_server(self):
-        """Start the MCP server"""
-        env = os.environ.copy()
-        env["MCP_DOTNET_ALLOWED_PATHS"] = self.test_dir
-        
-        self.server_proc = subprocess.Popen(
-            ["dotnet", "run", "--project", "src/Spelunk.Server", "--no-build"],
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            env=env,
-            text=True
-        )
-        
-        # Initialize
-        self.send_request({
-            "jsonrpc": "2.0",
-            "id": 0,
-            "method": "initialize",
-            "params": {"protocolVersion": "2024-11-05"}
-        })
-        
-        response = self.read_response()
-        if not response or "error" in response:
-            raise Exception(f"Failed to initialize server: {response}")
-            
-    def stop_server(self):
-        """Stop the MCP server"""
-        if self.server_proc:
-            self.server_proc.terminate()
-            self.server_proc.wait()
-            
-    def send_request(self, request: Dict[str, Any]):
-        """Send a request to the server"""
-        json_str = json.dumps(request) + "\n"
-        self.server_proc.stdin.write(json_str)
-        self.server_proc.stdin.flush()
-        
-    def read_response(self) -> Dict[str, Any]:
-        """Read a response from the server"""
-        line = self.server_proc.stdout.readline()
-        if line:
-            return json.loads(line)
-        return None
-        
-    def create_test_file(self, filename: str, content: str) -> str:
-        """Create a test file and return its path"""
-        filepath = os.path.join(self.test_dir, filename)
-        with open(filepath, "w") as f:
-            f.write(content)
-        return filepath
-        
-    def query_syntax(self, filepath: str, roslyn_path: str) -> Dict[str, Any]:
-        """Execute a RoslynPath query"""
-        # Load workspace
-        self.send_request({
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "tools/call",
-            "params": {
-                "name": "spelunk-load-workspace",
-                "arguments": {"path": filepath}
-            }
-        })
-        
-        load_response = self.read_response()
-        if not load_response or "error" in load_response:
-            return {"error": f"Failed to load workspace: {load_response}"}
-            
-        # Query syntax
-        self.send_request({
-            "jsonrpc": "2.0",
-            "id": 2,
-            "method": "tools/call",
-            "params": {
-                "name": "spelunk-query-syntax",
-                "arguments": {
-                    "file": filepath,
-                    "roslynPath": roslyn_path
-                }
-            }
-        })
-        
-        query_response = self.read_response()
-        if not query_response:
-            return {"error": "No response from query"}
-            
-        if "error" in query_response:
-            return {"error": query_response["error"]}
-            
-        # Parse the result
-        try:
-            content = query_response["result"]["content"][0]["text"]
-            return json.loads(content)
-        except:
-            return {"error": f"Failed to parse response: {query_response}"}
-            
-    def run_test(self, name: str, code: str, path: str, expected_count: int = None, 
-                  expected_types: List[str] = None, should_contain: str = None):
-        """Run a single test"""
-        print(f"\nTest: {name}")
-        print(f"  Path: {path}")
-        
-        # Create test file
-        filepath = self.create_test_file(f"test_{len(self.tests)}.cs", code)
-        
-        # Run query
-        result = self.query_syntax(filepath, path)
-        
-        if "error" in result:
-            print(f"  ❌ FAILED: {result['error']}")
-            self.failed += 1
-            return False
-            
-        matches = result.get("matches", [])
-        
-        # Check expected count
-        if expected_count is not None:
-            if len(matches) != expected_count:
-                print(f"  ❌ FAILED: Expected {expected_count} matches, got {len(matches)}")
-                self.failed += 1
-                return False
-                
-        # Check expected types
-        if expected_types:
-            actual_types = [m.get("nodeType", "") for m in matches]
-            for expected_type in expected_types:
-                if expected_type not in actual_types:
-                    print(f"  ❌ FAILED: Expected type '{expected_type}' not found in {actual_types}")
-                    self.failed += 1
-                    return False
-                    
-        # Check content
-        if should_contain:
-            found = False
-            for match in matches:
-                if should_contain in match.get("preview", ""):
-                    found = True
-                    break
-            if not found:
-                print(f"  ❌ FAILED: No match contains '{should_contain}'")
-                self.failed += 1
-                return False
-                
-        print(f"  ✅ PASSED: {len(matches)} matches")
-        self.passed += 1
-        return True
-        
-    def run_all_tests(self):
-        """Run all integration tests"""
-        print("=" * 60)
-        print("RoslynPath Integration Tests")
-        print("=" * 60)
-        
-        # Test 1: Basic navigation
-        self.run_test(
-            "Basic child navigation",
-            """
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "utils"))
+
+from json_codec import dumps, loads
+
+# All integration tests: (name, code, path, checks)
+# checks may contain expected_count, expected_types, should_contain
+TESTS = [
+    ("Basic child navigation",
+     """
 namespace TestNS
 {
     public class TestClass
@@ -186,14 +29,11 @@ namespace TestNS
     }
 }
 """,
-            "/namespace/class/method",
-            expected_count=1
-        )
-        
-        # Test 2: Wildcard with name predicate (the bug we fixed)
-        self.run_test(
-            "Wildcard with name predicate",
-            """
+     "/namespace/class/method",
+     {"expected_count": 1}),
+
+    ("Wildcard with name predicate",
+     """
 public class TestClass
 {
     public void foo() { }
@@ -201,14 +41,11 @@ public class TestClass
     private string foo = "field";
 }
 """,
-            "//*[@name='foo']",
-            expected_count=2
-        )
-        
-        # Test 3: Descendant navigation
-        self.run_test(
-            "Descendant navigation",
-            """
+     "//*[@name='foo']",
+     {"expected_count": 2}),
+
+    ("Descendant navigation",
+     """
 namespace NS
 {
     public class Outer
@@ -222,14 +59,11 @@ namespace NS
     }
 }
 """,
-            "//method",
-            expected_count=3
-        )
-        
-        # Test 4: Position predicates
-        self.run_test(
-            "Position predicates",
-            """
+     "//method",
+     {"expected_count": 3}),
+
+    ("Position predicates",
+     """
 public class Test
 {
     public void Method()
@@ -241,15 +75,11 @@ public class Test
     }
 }
 """,
-            "//block/statement[1]",
-            expected_count=1,
-            should_contain="var a = 1"
-        )
-        
-        # Test 5: Last position
-        self.run_test(
-            "Last position predicate",
-            """
+     "//block/statement[1]",
+     {"expected_count": 1, "should_contain": "var a = 1"}),
+
+    ("Last position predicate",
+     """
 public class Test
 {
     public void Method()
@@ -261,15 +91,11 @@ public class Test
     }
 }
 """,
-            "//block/statement[last()]",
-            expected_count=1,
-            should_contain="var d = 4"
-        )
-        
-        # Test 6: Enhanced node types
-        self.run_test(
-            "Enhanced if-statement type",
-            """
+     "//block/statement[last()]",
+     {"expected_count": 1, "should_contain": "var d = 4"}),
+
+    ("Enhanced if-statement type",
+     """
 public class Test
 {
     public void Method()
@@ -280,14 +106,11 @@ public class Test
     }
 }
 """,
-            "//if-statement",
-            expected_count=1
-        )
-        
-        # Test 7: Binary expressions with operator
-        self.run_test(
-            "Binary expression with operator",
-            """
+     "//if-statement",
+     {"expected_count": 1}),
+
+    ("Binary expression with operator",
+     """
 public class Test
 {
     public void Method()
@@ -298,14 +121,11 @@ public class Test
     }
 }
 """,
-            "//binary-expression[@operator='==']",
-            expected_count=1
-        )
-        
-        # Test 8: Contains predicate
-        self.run_test(
-            "Contains predicate",
-            """
+     "//binary-expression[@operator='==']",
+     {"expected_count": 1}),
+
+    ("Contains predicate",
+     """
 public class Test
 {
     public void Method()
@@ -316,14 +136,11 @@ public class Test
     }
 }
 """,
-            "//statement[@contains='Console.WriteLine']",
-            expected_count=2
-        )
-        
-        # Test 9: Boolean predicates
-        self.run_test(
-            "Async method predicate",
-            """
+     "//statement[@contains='Console.WriteLine']",
+     {"expected_count": 2}),
+
+    ("Async method predicate",
+     """
 public class Test
 {
     public async Task Method1() { await Task.Delay(1); }
@@ -331,14 +148,11 @@ public class Test
     public static async Task Method3() { await Task.Delay(1); }
 }
 """,
-            "//method[@async]",
-            expected_count=2
-        )
-        
-        # Test 10: Complex AND predicate
-        self.run_test(
-            "Complex AND predicate",
-            """
+     "//method[@async]",
+     {"expected_count": 2}),
+
+    ("Complex AND predicate",
+     """
 public class Test
 {
     public async Task Method1() { }
@@ -347,14 +161,11 @@ public class Test
     public static async Task Method4() { }
 }
 """,
-            "//method[@async and @public]",
-            expected_count=2
-        )
-        
-        # Test 11: Complex OR predicate
-        self.run_test(
-            "Complex OR predicate",
-            """
+     "//method[@async and @public]",
+     {"expected_count": 2}),
+
+    ("Complex OR predicate",
+     """
 public class Test
 {
     public void Method1() { }
@@ -362,14 +173,11 @@ public class Test
     protected void Method3() { }
 }
 """,
-            "//method[@public or @private]",
-            expected_count=2
-        )
-        
-        # Test 12: NOT predicate
-        self.run_test(
-            "NOT predicate",
-            """
+     "//method[@public or @private]",
+     {"expected_count": 2}),
+
+    ("NOT predicate",
+     """
 public class Test
 {
     public void Method1() { }
@@ -377,14 +185,11 @@ public class Test
     public static void Method3() { }
 }
 """,
-            "//method[not(@static)]",
-            expected_count=2
-        )
-        
-        # Test 13: Null check pattern
-        self.run_test(
-            "Null check pattern",
-            """
+     "//method[not(@static)]",
+     {"expected_count": 2}),
+
+    ("Null check pattern",
+     """
 public class Test
 {
     public void Method(string param)
@@ -395,14 +200,11 @@ public class Test
     }
 }
 """,
-            "//binary-expression[@operator='==' and @right-text='null']",
-            expected_count=1
-        )
-        
-        # Test 14: Method with wildcard name
-        self.run_test(
-            "Method with wildcard name",
-            """
+     "//binary-expression[@operator='==' and @right-text='null']",
+     {"expected_count": 1}),
+
+    ("Method with wildcard name",
+     """
 public class Test
 {
     public void GetUser() { }
@@ -411,24 +213,21 @@ public class Test
     public void DeleteUser() { }
 }
 """,
-            "//method[Get*]",
-            expected_count=2
-        )
-        
-        # Test 15: Complex nested predicate
-        self.run_test(
-            "Complex nested predicate",
-            """
+     "//method[Get*]",
+     {"expected_count": 2}),
+
+    ("Complex nested predicate",
+     """
 public class Test
 {
     public void Method1()
     {
-        if (x == null) 
+        if (x == null)
         {
             throw new ArgumentNullException();
         }
     }
-    
+
     public void Method2()
     {
         if (y == null)
@@ -438,36 +237,273 @@ public class Test
     }
 }
 """,
-            "//if-statement[.//throw-statement]",
-            expected_count=1
+     "//if-statement[.//throw-statement]",
+     {"expected_count": 1}),
+]
+
+class RoslynPathIntegrationTester:
+    # Pre-compiled request envelopes: every request shares the same
+    # jsonrpc/method/name scaffolding, so only the id and the small
+    # arguments object are serialized per call
+    LOAD_TMPL = (b'{"jsonrpc":"2.0","id":%d,"method":"tools/call",'
+                 b'"params":{"name":"spelunk-load-workspace","arguments":%b}}\n')
+    QUERY_TMPL = (b'{"jsonrpc":"2.0","id":%d,"method":"tools/call",'
+                  b'"params":{"name":"spelunk-query-syntax","arguments":%b}}\n')
+
+    def __init__(self):
+        self.server_proc = None
+        self.test_dir = tempfile.mkdtemp(prefix="roslynpath_test_")
+        self.passed = 0
+        self.failed = 0
+        self.next_id = 0
+        self.pending: Dict[int, Future] = {}
+        self.reader_thread = None
+        self.loaded_files = set()
+
+    def start_server(self):
+        """Start the MCP server"""
+        env = os.environ.copy()
+        env["MCP_DOTNET_ALLOWED_PATHS"] = self.test_dir
+
+        # Binary pipes: orjson parses the raw bytes without the
+        # per-line utf-8 decode a TextIOWrapper would add
+        self.server_proc = subprocess.Popen(
+            ["dotnet", "run", "--project", "src/Spelunk.Server", "--no-build"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            env=env
         )
-        
+        self._stdin_fd = self.server_proc.stdin.fileno()
+
+        # One reader thread owns stdout for the whole session and
+        # resolves each response's future as soon as its line arrives
+        self.reader_thread = threading.Thread(target=self._reader_loop, daemon=True)
+        self.reader_thread.start()
+
+        # Initialize
+        future = self.send_request("initialize", {"protocolVersion": "2024-11-05"})
+
+        response = future.result(timeout=60)
+        if not response or "error" in response:
+            raise Exception(f"Failed to initialize server: {response}")
+
+    def stop_server(self):
+        """Stop the MCP server"""
+        if self.server_proc:
+            self.server_proc.terminate()
+            self.server_proc.wait()
+
+    def _next_id(self) -> int:
+        self.next_id += 1
+        return self.next_id
+
+    def _reader_loop(self):
+        """Dispatch every stdout line to the future registered for its id"""
+        # Local bindings keep the per-line hot path on LOAD_FAST
+        # instead of global/attribute lookups per response
+        _loads = loads
+        pending = self.pending
+        for line in self.server_proc.stdout:
+            try:
+                response = _loads(line)
+            except ValueError:
+                continue
+            future = pending.pop(response.get("id"), None)
+            if future is not None:
+                future.set_result(response)
+        # Server exited: fail anything still outstanding
+        for future in self.pending.values():
+            if not future.done():
+                future.set_exception(RuntimeError("Server closed stdout"))
+        self.pending.clear()
+
+    def _register(self, request_id: int) -> Future:
+        future = Future()
+        self.pending[request_id] = future
+        return future
+
+    def _write_all(self, data: bytes) -> None:
+        """Write straight to the pipe fd, handling short writes.
+
+        Going through os.write skips the BufferedWriter and the
+        explicit flush syscall - one write per payload instead of two.
+        """
+        view = memoryview(data)
+        while view:
+            written = os.write(self._stdin_fd, view)
+            view = view[written:]
+
+    def send_request(self, method: str, params: Dict[str, Any]) -> Future:
+        """Send a single request; returns a future for its response"""
+        request_id = self._next_id()
+        future = self._register(request_id)
+        self._write_all(dumps({
+            "jsonrpc": "2.0",
+            "id": request_id,
+            "method": method,
+            "params": params
+        }) + b"\n")
+        return future
+
+    def send_serialized(self, request_ids: List[int], payload: bytes) -> Dict[int, Future]:
+        """Write a pre-serialized pipeline of requests in one flush.
+
+        Futures are registered before the write so the reader thread
+        can never race ahead of registration.
+        """
+        futures = {request_id: self._register(request_id) for request_id in request_ids}
+        self._write_all(payload)
+        return futures
+
+    def prepare_all_files(self) -> List[str]:
+        """Write every test's fixture up front with raw fd I/O.
+
+        All sources exist before the first request goes out, so the
+        pipelined load+query batch never stalls on file creation, and
+        os.open/os.write/os.close skips the TextIOWrapper layering
+        that open() would add per file.
+        """
+        filepaths = []
+        for i, (_, code, _, _) in enumerate(TESTS):
+            filepath = os.path.join(self.test_dir, f"test_{i}.cs")
+            fd = os.open(filepath, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                os.write(fd, code.encode())
+            finally:
+                os.close(fd)
+            filepaths.append(filepath)
+        return filepaths
+
+    def parse_query_response(self, query_response: Dict[str, Any]) -> Dict[str, Any]:
+        """Extract the query payload from a tool response"""
+        if not query_response:
+            return {"error": "No response from query"}
+
+        if "error" in query_response:
+            return {"error": query_response["error"]}
+
+        try:
+            content = query_response["result"]["content"][0]["text"]
+            return loads(content)
+        except:
+            return {"error": f"Failed to parse response: {query_response}"}
+
+    def check_result(self, name: str, path: str, result: Dict[str, Any],
+                     expected_count: int = None, expected_types: List[str] = None,
+                     should_contain: str = None) -> bool:
+        """Evaluate one test's query result against its expectations"""
+        print(f"\nTest: {name}")
+        print(f"  Path: {path}")
+
+        if "error" in result:
+            print(f"  ❌ FAILED: {result['error']}")
+            self.failed += 1
+            return False
+
+        matches = result.get("matches", [])
+
+        # Check expected count
+        if expected_count is not None:
+            if len(matches) != expected_count:
+                print(f"  ❌ FAILED: Expected {expected_count} matches, got {len(matches)}")
+                self.failed += 1
+                return False
+
+        # Check expected types
+        if expected_types:
+            actual_types = [m.get("nodeType", "") for m in matches]
+            for expected_type in expected_types:
+                if expected_type not in actual_types:
+                    print(f"  ❌ FAILED: Expected type '{expected_type}' not found in {actual_types}")
+                    self.failed += 1
+                    return False
+
+        # Check content
+        if should_contain:
+            found = False
+            for match in matches:
+                if should_contain in match.get("preview", ""):
+                    found = True
+                    break
+            if not found:
+                print(f"  ❌ FAILED: No match contains '{should_contain}'")
+                self.failed += 1
+                return False
+
+        print(f"  ✅ PASSED: {len(matches)} matches")
+        self.passed += 1
+        return True
+
+    def run_all_tests(self):
+        """Run all integration tests"""
+        print("=" * 60)
+        print("RoslynPath Integration Tests")
+        print("=" * 60)
+
+        # Pre-create every test file, then pipeline the whole suite's
+        # load+query pairs in one submission: a single write replaces 30
+        # request/readline round-trips, and the responses are
+        # demultiplexed by JSON-RPC id afterwards.
+        filepaths = self.prepare_all_files()
+
+        lines = []
+        request_ids = []
+        query_ids = []
+        for filepath, (_, _, path, _) in zip(filepaths, TESTS):
+            # Loading a workspace is the expensive half of each test;
+            # track what's already loaded so a file is loaded at most
+            # once per session, no matter how many tests query it
+            if filepath not in self.loaded_files:
+                self.loaded_files.add(filepath)
+                load_id = self._next_id()
+                request_ids.append(load_id)
+                lines.append(self.LOAD_TMPL % (load_id, dumps({"path": filepath})))
+            query_id = self._next_id()
+            query_ids.append(query_id)
+            request_ids.append(query_id)
+            lines.append(self.QUERY_TMPL % (
+                query_id, dumps({"file": filepath, "roslynPath": path})))
+
+        # Fire everything, then consume each query's future in order;
+        # the reader thread fills them in as the server answers, so a
+        # slow early query never delays the server working on later ones
+        futures = self.send_serialized(request_ids, b"".join(lines))
+        for query_id, (name, _, path, checks) in zip(query_ids, TESTS):
+            try:
+                response = futures[query_id].result(timeout=120)
+            except Exception:
+                response = None
+            result = self.parse_query_response(response)
+            self.check_result(name, path, result, **checks)
+
         # Print summary
         print("\n" + "=" * 60)
         print(f"Tests Passed: {self.passed}")
         print(f"Tests Failed: {self.failed}")
         print("=" * 60)
-        
+
         return self.failed == 0
 
 def main():
     tester = RoslynPathIntegrationTester()
-    
+
     try:
         print("Starting MCP server...")
+        # start_server blocks on the initialize response, which is the
+        # real readiness signal - no fixed sleep needed on top of it
         tester.start_server()
-        time.sleep(1)  # Give server time to start
-        
+
         success = tester.run_all_tests()
-        
+
         sys.exit(0 if success else 1)
-        
+
     except Exception as e:
         print(f"Error: {e}")
         sys.exit(1)
-        
+
     finally:
         tester.stop_server()
-        
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,14 @@
+"""
+Put tests/utils on sys.path exactly once
+
+Test drivers each rebuilt the utils path and appended it to sys.path at
+import time; importing this module does it once per interpreter, and
+the module cache makes every later import a no-op.
+"""
+
+import pathlib
+import sys
+
+_utils = str(pathlib.Path(__file__).parent / "utils")
+if _utils not in sys.path:
+    sys.path.insert(0, _utils)
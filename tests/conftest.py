@@ -0,0 +1,38 @@
+"""Shared pytest fixtures for the Python test suites.
+
+Every standalone script under tests/ historically spawned its own
+`dotnet run` server and paid the MSBuild + Roslyn warmup each time.
+Pytest-collected tests should instead depend on the `mcp_server`
+fixture below, which hands out one warm client backed by the shared
+session in tests/utils/server_session.py: the server starts once per
+pytest run and is torn down at interpreter exit.
+
+The hyphenated scripts (test-member-search.py, test-client.py, ...)
+are not importable as pytest modules, so they keep their __main__
+entry points; new underscore-named test modules get the shared server
+for free by taking `mcp_server` as an argument.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "utils"))
+
+import pytest
+
+from test_client import TestClient
+
+
+@pytest.fixture(scope="session")
+def mcp_server():
+    """One initialized MCP client per pytest session.
+
+    The underlying server process and its loaded workspaces are shared
+    across every test that uses this fixture, so the expensive
+    workspace load happens once instead of once per script.
+    """
+    client = TestClient(allowed_paths=["."])
+    yield client
+    # close() only detaches; server_session terminates the process at
+    # interpreter exit so late fixtures can still reuse it
+    client.close()
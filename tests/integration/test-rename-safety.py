@@ -1,47 +1,71 @@
 #!/usr/bin/env python3
-import json
+import io
 import subprocess
+import sys
 import time
 import os
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "utils"))
+
+from json_codec import dumps, loads
+from response_reader import ResponseReader
+
 def send_request(proc, request):
-    """Send a JSON-RPC request and get response"""
-    json_str = json.dumps(request)
-    proc.stdin.write(json_str + '\n')
+    """Write a JSON-RPC request without waiting; returns the request id"""
+    proc.stdin.write(dumps(request) + b'\n')
     proc.stdin.flush()
-    
-    # Read response
-    response = proc.stdout.readline()
-    if response:
-        data = json.loads(response)
-        if 'result' in data and 'content' in data['result']:
-            text = data['result']['content'][0]['text']
-            print(f"📥 Response:\n{text}")
-        elif 'error' in data:
-            print(f"❌ Error: {data['error']}")
-        return data
-    return None
+    return request["id"]
+
+def drain_responses(reader, expected_ids, timeout=60):
+    """Read responses until every expected id is seen, keyed by id"""
+    responses = {}
+    remaining = set(expected_ids)
+    deadline = time.monotonic() + timeout
+    while remaining:
+        data = reader.read_response(timeout=deadline - time.monotonic())
+        if data is None:
+            break
+        resp_id = data.get("id")
+        if resp_id in remaining:
+            responses[resp_id] = data
+            remaining.remove(resp_id)
+    return responses
+
+def report_response(data):
+    """Print the outcome of one rename response"""
+    if data is None:
+        print("❌ No response received")
+        return
+    if 'result' in data and 'content' in data['result']:
+        text = data['result']['content'][0]['text']
+        print(f"📥 Response:\n{text}")
+    elif 'error' in data:
+        print(f"❌ Error: {data['error']}")
 
 def test_rename_safety():
     # Start the MCP server
     cmd = [
-        "dotnet", "run", 
+        "dotnet", "run",
         "--project", "./src/Spelunk.Server/Spelunk.Server.csproj"]
-    
+
     print("Starting MCP server...")
+    # Merge rather than replace the environment: a one-key env dict
+    # strips PATH and DOTNET_* and sends the host down its slow
+    # re-resolution path (or kills the launch outright)
+    env = os.environ.copy()
+    env["MCP_DOTNET_ALLOWED_PATHS"] = os.path.abspath(".")
     proc = subprocess.Popen(
         cmd,
         stdin=subprocess.PIPE,
         stdout=subprocess.PIPE,
         stderr=subprocess.PIPE,
-        text=True,
-        bufsize=0
-    ,
-        env={"MCP_DOTNET_ALLOWED_PATHS": os.path.abspath(.)})
-    
-    # Give server time to start
-    time.sleep(2)
-    
+        bufsize=io.DEFAULT_BUFFER_SIZE,
+        env=env)
+
+    # Timed reads need the raw fd layer: the reader's select must see
+    # exactly what it has not consumed, with no BufferedReader between
+    reader = ResponseReader(proc.stdout.raw)
+
     try:
         # Initialize
         init_request = {
@@ -54,10 +78,6 @@ def test_rename_safety():
             },
             "id": 1
         }
-        proc.stdin.write(json.dumps(init_request) + '\n')
-        proc.stdin.flush()
-        proc.stdout.readline()  # Read response
-        
         # Load workspace
         load_request = {
             "jsonrpc": "2.0",
@@ -68,143 +88,100 @@ def test_rename_safety():
             },
             "id": 2
         }
-        proc.stdin.write(json.dumps(load_request) + '\n')
-        proc.stdin.flush()
-        proc.stdout.readline()  # Read response
-        time.sleep(2)  # Give time to load
-        
+
+        # Ship the whole init sequence in one pre-joined write so the
+        # server can pipeline parsing; the initialize response doubles
+        # as the readiness probe, so no fixed startup sleep is needed
+        buf = b"".join(dumps(req) + b"\n" for req in (init_request, load_request))
+        os.write(proc.stdin.fileno(), buf)
+        if not drain_responses(reader, {1}, timeout=30):
+            raise RuntimeError("Server did not answer initialize within 30s")
+        drain_responses(reader, {2})
+
         print("🔐 Testing Rename Safety Features")
         print("=" * 60)
-        
-        id_counter = 3
-        
-        # Test 1: Try to rename a C# keyword
-        print("\n=== 1. TRY TO RENAME TO A C# KEYWORD ===")
-        print("📤 Attempting to rename 'GetUserAsync' to 'class' (reserved keyword)")
-        request = {
-            "jsonrpc": "2.0",
-            "method": "tools/call",
-            "params": {
-                "name": "spelunk-rename-symbol",
-                "arguments": {
-                    "oldName": "GetUserAsync",
-                    "newName": "class",
-                    "symbolType": "method",
-                    "containerName": "UserController",
-                    "preview": True
-                }
-            },
-            "id": id_counter
-        }
-        send_request(proc, request)
-        id_counter += 1
-        time.sleep(0.5)
-        
-        # Test 2: Try to rename a system type
-        print("\n=== 2. TRY TO RENAME A SYSTEM TYPE ===")
-        print("📤 Attempting to rename 'string' to 'MyString' (dangerous!)")
-        request = {
-            "jsonrpc": "2.0",
-            "method": "tools/call",
-            "params": {
-                "name": "spelunk-rename-symbol",
-                "arguments": {
-                    "oldName": "string",
-                    "newName": "MyString",
-                    "symbolType": "type",
-                    "preview": True
-                }
-            },
-            "id": id_counter
-        }
-        send_request(proc, request)
-        id_counter += 1
-        time.sleep(0.5)
-        
-        # Test 3: Safe rename with preview - showing impact
-        print("\n=== 3. SAFE RENAME WITH IMPACT ANALYSIS ===")
-        print("📤 Preview renaming 'UserController' to 'UserManager'")
-        request = {
-            "jsonrpc": "2.0",
-            "method": "tools/call",
-            "params": {
-                "name": "spelunk-rename-symbol",
-                "arguments": {
-                    "oldName": "UserController",
-                    "newName": "UserManager",
-                    "symbolType": "type",
-                    "preview": True
-                }
-            },
-            "id": id_counter
-        }
-        send_request(proc, request)
-        id_counter += 1
-        time.sleep(0.5)
-        
-        # Test 4: Try to create a naming conflict
-        print("\n=== 4. TRY TO CREATE A NAMING CONFLICT ===")
-        print("📤 Attempting to rename 'GetDefaultUserName' to 'Name' (property already exists)")
-        request = {
-            "jsonrpc": "2.0",
-            "method": "tools/call",
-            "params": {
-                "name": "spelunk-rename-symbol",
-                "arguments": {
-                    "oldName": "GetDefaultUserName",
-                    "newName": "Name",
-                    "symbolType": "method",
-                    "containerName": "UserController",
-                    "preview": True
-                }
-            },
-            "id": id_counter
-        }
-        send_request(proc, request)
-        id_counter += 1
-        time.sleep(0.5)
-        
-        # Test 5: Public API warning
-        print("\n=== 5. PUBLIC API WARNING ===")
-        print("📤 Renaming public method 'GetByIdAsync' (shows public API warning)")
-        request = {
-            "jsonrpc": "2.0",
-            "method": "tools/call",
-            "params": {
-                "name": "spelunk-rename-symbol",
-                "arguments": {
-                    "oldName": "GetByIdAsync",
-                    "newName": "FetchByIdAsync",
-                    "symbolType": "method",
-                    "containerName": "UserRepository",
-                    "preview": True
-                }
-            },
-            "id": id_counter
-        }
-        send_request(proc, request)
-        id_counter += 1
-        
-        # Test 6: Empty name validation
-        print("\n=== 6. EMPTY NAME VALIDATION ===")
-        print("📤 Attempting to rename to empty string")
-        request = {
-            "jsonrpc": "2.0",
-            "method": "tools/call",
-            "params": {
-                "name": "spelunk-rename-symbol",
-                "arguments": {
-                    "oldName": "ProcessUser",
-                    "newName": "",
-                    "symbolType": "method",
-                    "containerName": "UserController",
-                    "preview": True
-                }
-            },
-            "id": id_counter
-        }
-        send_request(proc, request)
-        
+
+        # All six safety scenarios: (header, announcement, rename arguments)
+        tests = [
+            ("=== 1. TRY TO RENAME TO A C# KEYWORD ===",
+             "📤 Attempting to rename 'GetUserAsync' to 'class' (reserved keyword)",
+             {
+                 "oldName": "GetUserAsync",
+                 "newName": "class",
+                 "symbolType": "method",
+                 "containerName": "UserController",
+                 "preview": True
+             }),
+            ("=== 2. TRY TO RENAME A SYSTEM TYPE ===",
+             "📤 Attempting to rename 'string' to 'MyString' (dangerous!)",
+             {
+                 "oldName": "string",
+                 "newName": "MyString",
+                 "symbolType": "type",
+                 "preview": True
+             }),
+            ("=== 3. SAFE RENAME WITH IMPACT ANALYSIS ===",
+             "📤 Preview renaming 'UserController' to 'UserManager'",
+             {
+                 "oldName": "UserController",
+                 "newName": "UserManager",
+                 "symbolType": "type",
+                 "preview": True
+             }),
+            ("=== 4. TRY TO CREATE A NAMING CONFLICT ===",
+             "📤 Attempting to rename 'GetDefaultUserName' to 'Name' (property already exists)",
+             {
+                 "oldName": "GetDefaultUserName",
+                 "newName": "Name",
+                 "symbolType": "method",
+                 "containerName": "UserController",
+                 "preview": True
+             }),
+            ("=== 5. PUBLIC API WARNING ===",
+             "📤 Renaming public method 'GetByIdAsync' (shows public API warning)",
+             {
+                 "oldName": "GetByIdAsync",
+                 "newName": "FetchByIdAsync",
+                 "symbolType": "method",
+                 "containerName": "UserRepository",
+                 "preview": True
+             }),
+            ("=== 6. EMPTY NAME VALIDATION ===",
+             "📤 Attempting to rename to empty string",
+             {
+                 "oldName": "ProcessUser",
+                 "newName": "",
+                 "symbolType": "method",
+                 "containerName": "UserController",
+                 "preview": True
+             }),
+        ]
+
+        # Pipeline all six requests in one write, then drain the
+        # responses and demultiplex by id. Total wall time is one
+        # round-trip plus server compute instead of six round-trips
+        # with sleep pads between them.
+        requests = []
+        for i, (_, _, arguments) in enumerate(tests):
+            requests.append({
+                "jsonrpc": "2.0",
+                "method": "tools/call",
+                "params": {
+                    "name": "spelunk-rename-symbol",
+                    "arguments": arguments
+                },
+                "id": 3 + i
+            })
+
+        proc.stdin.write(b"\n".join(map(dumps, requests)) + b"\n")
+        proc.stdin.flush()
+        responses = drain_responses(reader, [req["id"] for req in requests])
+
+        for (header, announcement, _), request in zip(tests, requests):
+            print(f"\n{header}")
+            print(announcement)
+            report_response(responses.get(request["id"]))
+
     finally:
         proc.terminate()
         proc.wait()
@@ -212,4 +189,4 @@ def test_rename_safety():
 if __name__ == "__main__":
     print("🔐 Testing MCP Rename Tool Safety Features")
     print("=" * 70)
-    test_rename_safety()
\ No newline at end of file
+    test_rename_safety()
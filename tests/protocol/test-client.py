@@ -4,84 +4,128 @@ Interactive test client for MCP Roslyn Server
 Allows you to send JSON-RPC requests and see responses
 """
 
+import asyncio
+import collections
+import functools
 import json
-import subprocess
+import os
 import sys
-import threading
-import queue
-import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "utils"))
+
+from json_codec import dumps, loads
+
+
+@functools.lru_cache(maxsize=64)
+def _envelope(method, with_params=True):
+    """Request template per method: the constant envelope bytes are
+    serialized once; only the id and params payload vary per call"""
+    if with_params:
+        return b'{"jsonrpc":"2.0","id":%d,"method":"' + method.encode() + b'","params":%b}'
+    return b'{"jsonrpc":"2.0","id":%d,"method":"' + method.encode() + b'"}'
+
 
 class McpTestClient:
+    """Single-threaded asyncio client.
+
+    The pipe is single-producer single-consumer, so one event loop
+    with a background reader task replaces the reader thread + lock
+    machinery: no GIL handoff per response, and in-flight requests are
+    plain futures the reader completes by id.
+    """
+
     def __init__(self, server_command):
         self.server_command = server_command
         self.process = None
-        self.response_queue = queue.Queue()
+        self._waiters = {}
         self.request_id = 0
-        
-    def start(self):
+        # Server log chatter lands in a bounded ring buffer and is only
+        # printed on failure (or live under MCP_DEBUG); echoing every
+        # line to the tty serializes the reader against terminal writes
+        self._stderr_log = collections.deque(maxlen=1000)
+        self._debug = bool(os.getenv("MCP_DEBUG"))
+
+    async def start(self):
         """Start the MCP server process"""
         print(f"Starting server: {' '.join(self.server_command)}")
-        self.process = subprocess.Popen(
-            self.server_command,
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            bufsize=0
+        self.process = await asyncio.create_subprocess_exec(
+            *self.server_command,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
         )
-        
-        # Start threads to read stdout and stderr
-        threading.Thread(target=self._read_stdout, daemon=True).start()
-        threading.Thread(target=self._read_stderr, daemon=True).start()
-        
-        # Give server time to start
-        time.sleep(1)
-        
-    def _read_stdout(self):
-        """Read JSON-RPC responses from stdout"""
-        for line in self.process.stdout:
-            if line.strip():
-                # Skip build output and warnings
-                if line.strip().startswith('/') or 'warning CS' in line or '.csproj' in line:
-                    continue
-                print(f"<<< RESPONSE: {line.strip()}")
-                try:
-                    response = json.loads(line)
-                    self.response_queue.put(response)
-                except json.JSONDecodeError as e:
-                    print(f"Error parsing response: {e}")
-                    
-    def _read_stderr(self):
-        """Read log messages from stderr"""
-        for line in self.process.stderr:
-            print(f"[LOG] {line.strip()}")
-            
-    def send_request(self, method, params=None):
-        """Send a JSON-RPC request"""
+
+        self._stdout_task = asyncio.create_task(self._read_stdout())
+        self._stderr_task = asyncio.create_task(self._read_stderr())
+
+    async def _read_stdout(self):
+        """Dispatch JSON-RPC responses from stdout to their waiters"""
+        while True:
+            line = await self.process.stdout.readline()
+            if not line:
+                break
+            if not line.strip():
+                continue
+            # Skip build output and warnings
+            if line.strip().startswith(b'/') or b'warning CS' in line or b'.csproj' in line:
+                continue
+            print(f"<<< RESPONSE: {line.strip().decode(errors='replace')}")
+            try:
+                response = loads(line)
+            except ValueError as e:
+                print(f"Error parsing response: {e}")
+                continue
+            waiter = self._waiters.pop(response.get("id"), None)
+            if waiter is not None and not waiter.done():
+                waiter.set_result(response)
+
+    async def _read_stderr(self):
+        """Collect server log output into the ring buffer"""
+        while True:
+            line = await self.process.stderr.readline()
+            if not line:
+                break
+            text = line.decode(errors="replace").strip()
+            if text:
+                self._stderr_log.append(text)
+                if self._debug:
+                    print(f"[LOG] {text}")
+
+    def _dump_stderr_log(self):
+        """Print the buffered server log, oldest lines first"""
+        if not self._stderr_log:
+            return
+        print(f"--- last {len(self._stderr_log)} server log lines ---")
+        while self._stderr_log:
+            print(f"[LOG] {self._stderr_log.popleft()}")
+
+    async def send_request(self, method, params=None):
+        """Send a JSON-RPC request and await its response"""
         self.request_id += 1
-        request = {
-            "jsonrpc": "2.0",
-            "id": self.request_id,
-            "method": method
-        }
+        request_id = self.request_id
         if params is not None:
-            request["params"] = params
-            
-        request_json = json.dumps(request)
-        print(f">>> REQUEST: {request_json}")
-        
-        self.process.stdin.write(request_json + "\n")
-        self.process.stdin.flush()
-        
-        # Wait for response
+            request_json = _envelope(method) % (request_id, dumps(params))
+        else:
+            request_json = _envelope(method, with_params=False) % request_id
+        print(f">>> REQUEST: {request_json.decode()}")
+
+        # Register before writing so the reader can't race the await
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters[request_id] = waiter
+
+        self.process.stdin.write(request_json + b"\n")
+        await self.process.stdin.drain()
+
         try:
-            response = self.response_queue.get(timeout=5)
-            return response
-        except queue.Empty:
+            return await asyncio.wait_for(waiter, timeout=5)
+        except asyncio.TimeoutError:
             print("Timeout waiting for response")
+            self._dump_stderr_log()
             return None
-            
-    def interactive_mode(self):
+        finally:
+            self._waiters.pop(request_id, None)
+
+    async def interactive_mode(self):
         """Run in interactive mode"""
         print("\nMCP Test Client - Interactive Mode")
         print("Commands:")
@@ -92,24 +136,27 @@ class McpTestClient:
         print("  call <tool> <args> - Call a tool with JSON args")
         print("  raw <json> - Send raw JSON-RPC request")
         print("  quit - Exit\n")
-        
+
+        loop = asyncio.get_running_loop()
         while True:
             try:
-                cmd = input("> ").strip()
+                # Blocking input runs off-loop so responses and log
+                # lines keep flowing while the prompt is idle
+                cmd = (await loop.run_in_executor(None, input, "> ")).strip()
                 if not cmd:
                     continue
-                    
+
                 parts = cmd.split(maxsplit=1)
                 command = parts[0].lower()
-                
+
                 if command == "quit":
                     break
                 elif command == "init":
-                    self.send_request("initialize", {})
+                    await self.send_request("initialize", {})
                 elif command == "list":
-                    self.send_request("tools/list", {})
+                    await self.send_request("tools/list", {})
                 elif command == "status":
-                    self.send_request("tools/call", {
+                    await self.send_request("tools/call", {
                         "name": "spelunk-workspace-status",
                         "arguments": {}
                     })
@@ -117,7 +164,7 @@ class McpTestClient:
                     if len(parts) < 2:
                         print("Usage: load <path>")
                         continue
-                    self.send_request("tools/call", {
+                    await self.send_request("tools/call", {
                         "name": "spelunk-load-workspace",
                         "arguments": {"path": parts[1]}
                     })
@@ -128,7 +175,7 @@ class McpTestClient:
                     tool_parts = parts[1].split(maxsplit=1)
                     tool_name = tool_parts[0]
                     args = json.loads(tool_parts[1]) if len(tool_parts) > 1 else {}
-                    self.send_request("tools/call", {
+                    await self.send_request("tools/call", {
                         "name": tool_name,
                         "arguments": args
                     })
@@ -137,34 +184,36 @@ class McpTestClient:
                         print("Usage: raw <json>")
                         continue
                     request = json.loads(parts[1])
-                    self.send_request(request.get("method", ""), request.get("params"))
+                    await self.send_request(request.get("method", ""), request.get("params"))
                 else:
                     print(f"Unknown command: {command}")
-                    
-            except KeyboardInterrupt:
+
+            except (KeyboardInterrupt, EOFError):
                 print("\nUse 'quit' to exit")
             except Exception as e:
                 print(f"Error: {e}")
-                
-    def stop(self):
+
+    async def stop(self):
         """Stop the server"""
         if self.process:
+            self._stdout_task.cancel()
+            self._stderr_task.cancel()
             self.process.terminate()
-            self.process.wait()
+            await self.process.wait()
 
-def main():
+async def main():
     # Server command - adjust path as needed
     server_cmd = [
         "dotnet", "run",
         "--project", "./src/Spelunk.Server/Spelunk.Server.csproj"]
-    
+
     client = McpTestClient(server_cmd)
-    
+
     try:
-        client.start()
-        client.interactive_mode()
+        await client.start()
+        await client.interactive_mode()
     finally:
-        client.stop()
+        await client.stop()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    asyncio.run(main())
@@ -1,56 +1,84 @@
 #!/usr/bin/env python3
-import json
+import io
 import subprocess
-import time
+import sys
 import os
 
-def send_request(proc, request):
-    """Send a JSON-RPC request and get response"""
-    json_str = json.dumps(request)
-    method_name = request['params']['arguments'].get('methodName', '')
-    class_name = request['params']['arguments'].get('className', '')
-    tool_name = request['params']['name']
-    
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "utils"))
+
+from json_codec import dumps, loads
+from response_reader import ResponseReader
+from server_session import server_command
+
+# The tools/call envelope is constant; only the tool name, arguments
+# and id vary. Pre-baking it as a template skips rebuilding the same
+# nested dicts for every request, and the compact separators drop the
+# whitespace json.dumps would otherwise pad each line with.
+_TOOL_CALL_TMPL = b'{"jsonrpc":"2.0","method":"tools/call","params":{"name":"%s","arguments":%b},"id":%d}\n'
+
+def tool_call(tool, arguments, request_id):
+    """Serialize a tools/call request from the precomputed envelope"""
+    return _TOOL_CALL_TMPL % (tool.encode(), dumps(arguments), request_id)
+
+def announce(tool_name, method_name, class_name):
+    """Print what a call is about to analyze"""
     if 'find-method-calls' in tool_name:
         print(f"\n📤 Finding methods called by {class_name}.{method_name}")
     else:
         print(f"\n📤 Finding methods that call {class_name}.{method_name}")
-    
-    proc.stdin.write(json_str + '\n')
-    proc.stdin.flush()
-    
-    # Read response
-    response = proc.stdout.readline()
-    if response:
-        data = json.loads(response)
-        if 'result' in data and 'content' in data['result']:
-            text = data['result']['content'][0]['text']
-            print(f"📥 Response:\n{text}")
-        elif 'error' in data:
-            print(f"❌ Error: {data['error']}")
-        return data
-    return None
+
+def report_response(data):
+    """Print the outcome of one analysis response"""
+    if data is None:
+        print("❌ No response received")
+        return
+    if 'result' in data and 'content' in data['result']:
+        text = data['result']['content'][0]['text']
+        print(f"📥 Response:\n{text}")
+    elif 'error' in data:
+        print(f"❌ Error: {data['error']}")
+
+def drain_responses(reader, expected_ids):
+    """Read responses until every expected id is seen, keyed by id"""
+    responses = {}
+    remaining = set(expected_ids)
+    while remaining:
+        data = reader.read_response()
+        if data is None:
+            break
+        resp_id = data.get("id")
+        if resp_id in remaining:
+            responses[resp_id] = data
+            remaining.remove(resp_id)
+    return responses
 
 def test_method_calls():
     # Start the MCP server
-    cmd = [
-        "dotnet", "run", 
-        "--project", "./src/Spelunk.Server/Spelunk.Server.csproj"]
+    # The runner builds the server once up front; server_command execs
+    # the built assembly directly when it can, skipping the dotnet-run
+    # host layer and its project re-evaluation entirely
+    cmd = server_command()
     
     print("Starting MCP server...")
+    # Merge rather than replace the environment: a one-key env dict
+    # strips PATH and DOTNET_* and sends the host down its slow
+    # re-resolution path (or kills the launch outright)
+    env = os.environ.copy()
+    env["MCP_DOTNET_ALLOWED_PATHS"] = os.path.abspath(".")
     proc = subprocess.Popen(
         cmd,
         stdin=subprocess.PIPE,
         stdout=subprocess.PIPE,
         stderr=subprocess.PIPE,
         text=True,
-        bufsize=0
-    ,
-        env={"MCP_DOTNET_ALLOWED_PATHS": os.path.abspath(.)})
-    
-    # Give server time to start
-    time.sleep(2)
-    
+        # Unbuffered pipes cost a read syscall per byte on multi-KB
+        # responses; block buffering lets readline scan in user space
+        bufsize=io.DEFAULT_BUFFER_SIZE,
+        env=env)
+
+    # Large responses come through the incremental block reader
+    reader = ResponseReader(proc.stdout.buffer)
+
     try:
         # Initialize
         init_request = {
@@ -63,115 +91,59 @@ def test_method_calls():
             },
             "id": 1
         }
-        proc.stdin.write(json.dumps(init_request) + '\n')
-        proc.stdin.flush()
-        proc.stdout.readline()  # Read response
-        
+        proc.stdin.buffer.write(dumps(init_request) + b'\n')
+        proc.stdin.buffer.flush()
+        # The initialize response doubles as the readiness signal
+        reader.read_response()
+
         # Load workspace
-        load_request = {
-            "jsonrpc": "2.0",
-            "method": "tools/call",
-            "params": {
-                "name": "spelunk-load-workspace",
-                "arguments": {"path": "./src/Spelunk.Server/Spelunk.Server.sln"}
-            },
-            "id": 2
-        }
-        proc.stdin.write(json.dumps(load_request) + '\n')
-        proc.stdin.flush()
-        proc.stdout.readline()  # Read response
-        time.sleep(2)  # Give time to load
-        
+        proc.stdin.buffer.write(tool_call(
+            "spelunk-load-workspace",
+            {"path": "./src/Spelunk.Server/Spelunk.Server.sln"}, 2))
+        proc.stdin.buffer.flush()
+        # The load response only arrives once loading finished; the
+        # JSON-RPC ordering guarantee makes extra settle time redundant
+        reader.read_response()
+
         print("🔍 Enhanced Testing of Method Call Analysis")
         print("=" * 60)
-        
-        # Test interesting method call chains
-        id_counter = 3
-        
-        # Test UserController.GetUserAsync - should show the call tree
-        request = {
-            "jsonrpc": "2.0",
-            "method": "tools/call",
-            "params": {
-                "name": "spelunk-find-method-calls",
-                "arguments": {
-                    "methodName": "GetUserAsync",
-                    "className": "UserController"
-                }
-            },
-            "id": id_counter
-        }
-        send_request(proc, request)
-        id_counter += 1
-        time.sleep(0.5)
-        
-        # Test UserController.ProcessUser - who calls it?
-        request = {
-            "jsonrpc": "2.0",
-            "method": "tools/call",
-            "params": {
-                "name": "spelunk-find-method-callers",
-                "arguments": {
-                    "methodName": "ProcessUser",
-                    "className": "UserController"
-                }
-            },
-            "id": id_counter
-        }
-        send_request(proc, request)
-        id_counter += 1
-        time.sleep(0.5)
-        
-        # Test UserController.GetDefaultUserName - who calls this static method?
-        request = {
-            "jsonrpc": "2.0",
-            "method": "tools/call",
-            "params": {
-                "name": "spelunk-find-method-callers",
-                "arguments": {
-                    "methodName": "GetDefaultUserName",
-                    "className": "UserController"
-                }
-            },
-            "id": id_counter
-        }
-        send_request(proc, request)
-        id_counter += 1
-        time.sleep(0.5)
-        
-        # Test UserRepository.GetByIdAsync - what does it call?
-        request = {
-            "jsonrpc": "2.0",
-            "method": "tools/call",
-            "params": {
-                "name": "spelunk-find-method-calls",
-                "arguments": {
-                    "methodName": "GetByIdAsync",
-                    "className": "UserRepository"
-                }
-            },
-            "id": id_counter
-        }
-        send_request(proc, request)
-        id_counter += 1
-        time.sleep(0.5)
-        
-        # Test IMessageLogger.Log - who calls it?
-        request = {
-            "jsonrpc": "2.0",
-            "method": "tools/call",
-            "params": {
-                "name": "spelunk-find-method-callers",
-                "arguments": {
-                    "methodName": "Log",
-                    "className": "IMessageLogger"
-                }
-            },
-            "id": id_counter
-        }
-        send_request(proc, request)
-        id_counter += 1
-        
+
+        # The interesting call chains: (tool, method, class)
+        cases = [
+            # UserController.GetUserAsync - should show the call tree
+            ("spelunk-find-method-calls", "GetUserAsync", "UserController"),
+            # UserController.ProcessUser - who calls it?
+            ("spelunk-find-method-callers", "ProcessUser", "UserController"),
+            # UserController.GetDefaultUserName - who calls this static method?
+            ("spelunk-find-method-callers", "GetDefaultUserName", "UserController"),
+            # UserRepository.GetByIdAsync - what does it call?
+            ("spelunk-find-method-calls", "GetByIdAsync", "UserRepository"),
+            # IMessageLogger.Log - who calls it?
+            ("spelunk-find-method-callers", "Log", "IMessageLogger"),
+        ]
+
+        # The server consumes newline-delimited JSON-RPC rather than
+        # batch arrays, so the batched submission takes the pipelined
+        # form: all five requests go out in one write, then the
+        # responses are drained and dispatched by id. One round trip
+        # of latency instead of five, and no pacing sleeps. A single
+        # arguments dict is mutated per case - tool_call serializes it
+        # immediately, so nothing holds a reference past the append.
+        request_ids = list(range(3, 3 + len(cases)))
+        arguments = {"methodName": "", "className": ""}
+        payloads = []
+        for (tool, method_name, class_name), request_id in zip(cases, request_ids):
+            arguments["methodName"] = method_name
+            arguments["className"] = class_name
+            payloads.append(tool_call(tool, arguments, request_id))
+        proc.stdin.buffer.write(b"".join(payloads))
+        proc.stdin.buffer.flush()
+        responses = drain_responses(reader, request_ids)
+
+        for (tool, method_name, class_name), request_id in zip(cases, request_ids):
+            announce(tool, method_name, class_name)
+            report_response(responses.get(request_id))
+
     finally:
         proc.terminate()
         proc.wait()
@@ -1,43 +1,58 @@
 #!/usr/bin/env python3
-import json
+import io
 import subprocess
-import time
+import sys
 import os
 
-def send_request(proc, request):
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "utils"))
+
+from json_codec import dumps, loads
+from response_reader import ResponseReader
+from server_session import server_command
+
+def send_request(proc, reader, request):
     """Send a JSON-RPC request and get response"""
-    json_str = json.dumps(request)
-    print(f"Sending: {json_str}")
-    proc.stdin.write(json_str + '\n')
-    proc.stdin.flush()
-    
+    json_bytes = dumps(request)
+    print(f"Sending: {json_bytes.decode()}")
+    proc.stdin.buffer.write(json_bytes + b'\n')
+    proc.stdin.buffer.flush()
+
     # Read response
-    response = proc.stdout.readline()
-    if response:
-        print(f"Received: {response.strip()}")
-        return json.loads(response)
+    response = reader.read_response()
+    if response is not None:
+        print(f"Received: {dumps(response).decode()}")
+        return response
     return None
 
 def test_mcp_protocol():
     # Start the MCP server
-    cmd = [
-        "dotnet", "run", 
-        "--project", "./src/Spelunk.Server/Spelunk.Server.csproj"]
+    # The runner builds the server once up front; server_command execs
+    # the built assembly directly when it can, skipping the dotnet-run
+    # host layer and its project re-evaluation entirely
+    cmd = server_command()
     
     print("Starting MCP server...")
+    # Merge rather than replace the environment: a one-key env dict
+    # strips PATH and DOTNET_* and sends the host down its slow
+    # re-resolution path (or kills the launch outright)
+    env = os.environ.copy()
+    env["MCP_DOTNET_ALLOWED_PATHS"] = os.path.abspath(".")
     proc = subprocess.Popen(
         cmd,
         stdin=subprocess.PIPE,
         stdout=subprocess.PIPE,
         stderr=subprocess.PIPE,
         text=True,
-        bufsize=0
-    ,
-        env={"MCP_DOTNET_ALLOWED_PATHS": os.path.abspath(.)})
-    
-    # Give server time to start
-    time.sleep(2)
-    
+        # Unbuffered pipes cost a read syscall per byte on multi-KB
+        # responses; block buffering lets readline scan in user space
+        bufsize=io.DEFAULT_BUFFER_SIZE,
+        env=env)
+
+    # Large responses come through the incremental block reader
+    reader = ResponseReader(proc.stdout.buffer)
+
+    # No startup sleep: the first read below blocks until the server
+    # answers initialize, which is the readiness signal itself
     try:
         # 1. Initialize
         print("\n1. Testing initialize:")
@@ -56,7 +71,7 @@ def test_mcp_protocol():
             },
             "id": 1
         }
-        response = send_request(proc, init_request)
+        response = send_request(proc, reader, init_request)
         
         # 2. List tools
         print("\n2. Testing tools/list:")
@@ -65,7 +80,7 @@ def test_mcp_protocol():
             "method": "tools/list",
             "id": 2
         }
-        response = send_request(proc, tools_request)
+        response = send_request(proc, reader, tools_request)
         
         # 3. Load workspace
         print("\n3. Testing dotnet-load-workspace:")
@@ -80,7 +95,7 @@ def test_mcp_protocol():
             },
             "id": 3
         }
-        response = send_request(proc, load_request)
+        response = send_request(proc, reader, load_request)
         
         # 4. Get workspace status
         print("\n4. Testing dotnet-workspace-status:")
@@ -93,7 +108,7 @@ def test_mcp_protocol():
             },
             "id": 4
         }
-        response = send_request(proc, status_request)
+        response = send_request(proc, reader, status_request)
         
         # 5. Find classes with pattern
         print("\n5. Testing dotnet-find-class with pattern '*Manager':")
@@ -108,7 +123,7 @@ def test_mcp_protocol():
             },
             "id": 5
         }
-        response = send_request(proc, find_request)
+        response = send_request(proc, reader, find_request)
         
         # 6. Find interfaces
         print("\n6. Testing dotnet-find-class with pattern 'I*':")
@@ -123,7 +138,7 @@ def test_mcp_protocol():
             },
             "id": 6
         }
-        response = send_request(proc, find_request2)
+        response = send_request(proc, reader, find_request2)
         
     finally:
         proc.terminate()
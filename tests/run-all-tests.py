@@ -2,12 +2,19 @@
 """
 Run all MCP Roslyn Server tests and report results
 """
+import heapq
 import os
+import selectors
 import subprocess
 import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 import time
 
+# Only the tail of a child's output ever reaches the failure summary,
+# so capture is bounded at this many bytes per stream
+TAIL_BYTES = 65536
+
 class Colors:
     GREEN = '\033[92m'
     RED = '\033[91m'
@@ -22,20 +29,53 @@ def run_test(test_path):
         # Set environment for test
         env = os.environ.copy()
         env['MCP_DOTNET_ALLOWED_PATHS'] = str(Path(__file__).parent.parent)
-        
-        result = subprocess.run(
+
+        # Stream output into bounded tails instead of capture_output's
+        # unbounded strings, so a verbose child costs O(1) memory per
+        # concurrent test instead of its whole transcript. A selector
+        # multiplexes both pipes in this thread, which keeps partial
+        # output around for diagnostics when a test hangs and is
+        # killed - drain threads or subprocess.run would discard it.
+        proc = subprocess.Popen(
             [sys.executable, test_path],
-            capture_output=True,
-            text=True,
-            timeout=30,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
             env=env
         )
+        stdout_tail = bytearray()
+        stderr_tail = bytearray()
+        tails = {proc.stdout.fileno(): stdout_tail, proc.stderr.fileno(): stderr_tail}
+        sel = selectors.DefaultSelector()
+        sel.register(proc.stdout, selectors.EVENT_READ)
+        sel.register(proc.stderr, selectors.EVENT_READ)
+        deadline = start_time + 30
+        timed_out = False
+        while sel.get_map():
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                timed_out = True
+                break
+            for key, _ in sel.select(remaining):
+                chunk = os.read(key.fd, 65536)
+                if not chunk:
+                    sel.unregister(key.fileobj)
+                    continue
+                buffer = tails[key.fd]
+                buffer += chunk
+                if len(buffer) > TAIL_BYTES:
+                    del buffer[:len(buffer) - TAIL_BYTES]
+        sel.close()
+
+        if timed_out:
+            proc.kill()
+            proc.wait()
+            tail = (stderr_tail or stdout_tail).decode(errors="replace")
+            return False, 30.0, "Test timed out after 30 seconds\n" + tail
+        returncode = proc.wait()
         duration = time.time() - start_time
-        success = result.returncode == 0
-        output = result.stdout if success else result.stderr
-        return success, duration, output
-    except subprocess.TimeoutExpired:
-        return False, 30.0, "Test timed out after 30 seconds"
+        success = returncode == 0
+        tail = stdout_tail if success else stderr_tail
+        return success, duration, tail.decode(errors="replace")
     except Exception as e:
         return False, 0.0, f"Error running test: {e}"
 
@@ -53,7 +93,16 @@ def main():
         print(build_result.stderr)
         return 1
     print(f"{Colors.GREEN}✓ Build successful{Colors.RESET}\n")
-    
+
+    # Publish the built assembly to the child test processes: scripts
+    # going through tests/utils/server_session.py exec the DLL
+    # directly and skip both their own `dotnet build` and the project
+    # re-evaluation `dotnet run` does, so the one build above is
+    # amortized across the whole suite.
+    dll_candidates = sorted((server_path / 'bin' / 'Debug').glob('net*/Spelunk.Server.dll'))
+    if dll_candidates:
+        os.environ['SPELUNK_SERVER_DLL'] = str(dll_candidates[-1])
+
     # Find all test files
     test_dir = Path(__file__).parent
     test_files = []
@@ -67,27 +116,37 @@ def main():
         print(f"{Colors.RED}No test files found!{Colors.RESET}")
         return 1
     
-    print(f"{Colors.BLUE}Running {len(test_files)} tests...{Colors.RESET}\n")
-    
-    # Run tests
+    # Each test script is independent and spends most of its time
+    # waiting on its own server over stdio, so run them in parallel:
+    # wall time approaches the slowest test instead of the sum of all.
+    # Completion order is printed as tests finish; the summary below
+    # sorts results so its output stays deterministic.
+    max_workers = min(8, len(test_files))
+    print(f"{Colors.BLUE}Running {len(test_files)} tests with {max_workers} workers...{Colors.RESET}\n")
+
     passed = 0
     failed = 0
     results = []
-    
-    for test_file in test_files:
-        relative_path = test_file.relative_to(test_dir)
-        print(f"Running {relative_path}... ", end='', flush=True)
-        
-        success, duration, output = run_test(test_file)
-        results.append((relative_path, success, duration, output))
-        
-        if success:
-            print(f"{Colors.GREEN}✓ ({duration:.2f}s){Colors.RESET}")
-            passed += 1
-        else:
-            print(f"{Colors.RED}✗ ({duration:.2f}s){Colors.RESET}")
-            failed += 1
-    
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(run_test, str(test_file)): test_file.relative_to(test_dir)
+            for test_file in test_files
+        }
+        for future in as_completed(futures):
+            relative_path = futures[future]
+            success, duration, output = future.result()
+            results.append((relative_path, success, duration, output))
+
+            if success:
+                print(f"{relative_path}... {Colors.GREEN}✓ ({duration:.2f}s){Colors.RESET}", flush=True)
+                passed += 1
+            else:
+                print(f"{relative_path}... {Colors.RED}✗ ({duration:.2f}s){Colors.RESET}", flush=True)
+                failed += 1
+
+    results.sort(key=lambda r: str(r[0]))
+
     # Summary
     print(f"\n{Colors.BLUE}{'='*60}{Colors.RESET}")
     print(f"Test Summary: {Colors.GREEN}{passed} passed{Colors.RESET}, ", end='')
@@ -111,8 +170,9 @@ def main():
     total_time = sum(r[2] for r in results)
     print(f"Total execution time: {total_time:.2f}s")
     
-    # Find slowest tests
-    slowest = sorted(results, key=lambda x: x[2], reverse=True)[:3]
+    # Find slowest tests; nlargest keeps a 3-element heap instead of
+    # sorting the whole result list
+    slowest = heapq.nlargest(3, results, key=lambda r: r[2])
     print(f"\nSlowest tests:")
     for path, _, duration, _ in slowest:
         print(f"  {path}: {duration:.2f}s")
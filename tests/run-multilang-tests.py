@@ -44,13 +44,13 @@ def main():
         "tools/test-fsharp-projects.py",
     ]
     
-    # Check if all test files exist
-    missing_tests = []
-    for test in test_scripts:
-        test_path = os.path.join(os.path.dirname(__file__), test)
-        if not os.path.exists(test_path):
-            missing_tests.append(test)
-    
+    # Check if all test files exist: one scandir of tools/ reads the
+    # whole directory in a single syscall instead of a stat per script
+    tests_dir = os.path.dirname(os.path.abspath(__file__))
+    present = {entry.name for entry in os.scandir(os.path.join(tests_dir, "tools"))}
+    missing_tests = [test for test in test_scripts
+                     if os.path.basename(test) not in present]
+
     if missing_tests:
         print(f"\n✗ Missing test files:")
         for test in missing_tests:
@@ -62,11 +62,8 @@ def main():
     start_time = time.time()
     
     for test_script in test_scripts:
-        test_path = os.path.join(os.path.dirname(__file__), test_script)
+        test_path = os.path.join(tests_dir, test_script)
         results[test_script] = run_test(test_path)
-        
-        # Small delay between tests
-        time.sleep(1)
     
     end_time = time.time()
     duration = end_time - start_time
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Sharded parallel launcher for the tests/tools scripts
+
+Each tool test spends most of its time waiting on its own server over
+stdio, so running them sequentially wastes the idle cores. This
+launcher runs the folder's test-*.py scripts concurrently, one child
+process per script, and writes each script's combined output to
+tests/tools/logs/<name>.log so the logs never interleave.
+
+A slice of the folder can be run with --shard N/M (1-based): the
+sorted script list is partitioned round-robin into M shards and only
+shard N runs, which lets an outer harness spread the folder across
+machines.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+import time
+
+TOOLS_DIR = Path(__file__).parent
+LOGS_DIR = TOOLS_DIR / "logs"
+
+
+def run_test(test_path, log_path):
+    """Run one script, stream its output to its log, return (success, duration)"""
+    env = os.environ.copy()
+    env["MCP_DOTNET_ALLOWED_PATHS"] = str(TOOLS_DIR.parent.parent)
+
+    start_time = time.time()
+    with open(log_path, "wb") as log:
+        try:
+            returncode = subprocess.run(
+                [sys.executable, str(test_path)],
+                stdout=log,
+                stderr=subprocess.STDOUT,
+                env=env,
+                timeout=120,
+            ).returncode
+        except subprocess.TimeoutExpired:
+            log.write(b"\nTest timed out after 120 seconds\n")
+            return False, time.time() - start_time
+    return returncode == 0, time.time() - start_time
+
+
+def shard_of(test_files, shard_spec):
+    """Return the round-robin slice of test_files selected by 'N/M'"""
+    index, _, count = shard_spec.partition("/")
+    index, count = int(index), int(count)
+    if not 1 <= index <= count:
+        raise ValueError(f"shard index out of range: {shard_spec}")
+    return test_files[index - 1::count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run tests/tools scripts in parallel")
+    parser.add_argument("--shard", default="1/1", metavar="N/M",
+                        help="run only shard N of M (default: everything)")
+    parser.add_argument("--workers", type=int,
+                        default=max(1, (os.cpu_count() or 2) - 2),
+                        help="concurrent test processes (default: cores - 2)")
+    args = parser.parse_args()
+
+    test_files = sorted(TOOLS_DIR.glob("test-*.py"))
+    test_files = shard_of(test_files, args.shard)
+    if not test_files:
+        print("No test files in this shard")
+        return 0
+
+    LOGS_DIR.mkdir(exist_ok=True)
+
+    # Build once and publish the assembly before any worker starts:
+    # scripts going through tests/utils/server_session.py exec the DLL
+    # directly, instead of every worker racing its own dotnet build
+    # over the shared obj/ directory
+    if not os.environ.get("SPELUNK_SERVER_DLL"):
+        server_path = TOOLS_DIR.parent.parent / "src" / "Spelunk.Server"
+        print("Building server project...")
+        build_result = subprocess.run(
+            ["dotnet", "build", str(server_path), "--configuration", "Debug"],
+            capture_output=True,
+            text=True,
+        )
+        if build_result.returncode != 0:
+            print("Build failed:")
+            print(build_result.stderr)
+            return 1
+        dll_candidates = sorted((server_path / "bin" / "Debug").glob("net*/Spelunk.Server.dll"))
+        if dll_candidates:
+            os.environ["SPELUNK_SERVER_DLL"] = str(dll_candidates[-1])
+
+    workers = min(args.workers, len(test_files))
+    print(f"Running {len(test_files)} tests with {workers} workers "
+          f"(shard {args.shard}, logs in {LOGS_DIR.relative_to(TOOLS_DIR.parent)})")
+
+    passed = 0
+    failed = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(run_test, test_file, LOGS_DIR / f"{test_file.stem}.log"): test_file
+            for test_file in test_files
+        }
+        for future in as_completed(futures):
+            test_file = futures[future]
+            success, duration = future.result()
+            marker = "✓" if success else "✗"
+            print(f"{marker} {test_file.name} ({duration:.2f}s)", flush=True)
+            if success:
+                passed += 1
+            else:
+                failed.append(test_file)
+
+    print(f"\n{passed} passed, {len(failed)} failed")
+    for test_file in sorted(failed):
+        print(f"  ✗ {test_file.name} - see {LOGS_DIR / (test_file.stem + '.log')}")
+    return 0 if not failed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
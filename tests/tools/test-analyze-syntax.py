@@ -3,14 +3,19 @@
 Test the analyze-syntax tool in MCP Roslyn Server
 """
 
-import json
+import io
 import subprocess
-import time
 import signal
 import sys
 import os
 
-def send_request(process, method, params=None):
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "utils"))
+
+from json_codec import dumps, loads
+from response_reader import ResponseReader
+from server_session import server_command
+
+def send_request(process, reader, method, params=None):
     """Send a JSON-RPC request and get response"""
     request = {
         "jsonrpc": "2.0",
@@ -19,20 +24,18 @@ def send_request(process, method, params=None):
         "params": params or {}
     }
     
-    request_str = json.dumps(request)
-    print(f"\n>>> Sending: {request_str}")
-    
-    process.stdin.write(request_str + "\n")
-    process.stdin.flush()
+    request_bytes = dumps(request)
+    print(f"\n>>> Sending: {request_bytes.decode()}")
+
+    process.stdin.buffer.write(request_bytes + b"\n")
+    process.stdin.buffer.flush()
     
     # Read response
-    response_line = process.stdout.readline()
-    if response_line:
-        print(f"<<< Response: {response_line.strip()[:500]}..." if len(response_line.strip()) > 500 else f"<<< Response: {response_line.strip()}")
-        try:
-            return json.loads(response_line)
-        except:
-            return response_line
+    response = reader.read_response()
+    if response is not None:
+        response_str = dumps(response).decode()
+        print(f"<<< Response: {response_str[:500]}..." if len(response_str) > 500 else f"<<< Response: {response_str}")
+        return response
     return None
 
 def test_analyze_syntax():
@@ -42,10 +45,15 @@ def test_analyze_syntax():
     test_dir = os.path.dirname(os.path.abspath(__file__))
     workspace_dir = os.path.join(test_dir, '..', '..')
     workspace_dir = os.path.abspath(workspace_dir)
+
+    # Fixture paths, joined once instead of per request
+    project_csproj = os.path.join(workspace_dir, "test-workspace", "TestProject.csproj")
+    program_cs = os.path.join(workspace_dir, "test-workspace", "Program.cs")
     
-    # Start the server
+    # Start the server; server_command execs the built assembly
+    # directly when available instead of going through dotnet run
     server_path = os.path.join(workspace_dir, 'src', 'Spelunk.Server')
-    cmd = ['dotnet', 'run', '--project', server_path, '--no-build']
+    cmd = server_command(server_path)
     
     # Set environment variable for allowed paths
     env = os.environ.copy()
@@ -59,14 +67,19 @@ def test_analyze_syntax():
         stdout=subprocess.PIPE,
         stderr=subprocess.PIPE,
         text=True,
-        bufsize=1,
+        # Block buffering; writes are flushed explicitly after each
+        # request so line buffering bought nothing on the send side
+        bufsize=io.DEFAULT_BUFFER_SIZE,
         env=env
     )
-    
-    # Give server time to start
-    time.sleep(3)
-    
-    # Check if server started properly
+
+    # Syntax trees with trivia get large; the block reader pulls them
+    # off the pipe in 64 KiB reads instead of readline's newline scan
+    reader = ResponseReader(process.stdout.buffer)
+
+    # No startup sleep: initialize below blocks on its response, which
+    # doubles as the readiness probe; a fixed pause only adds wall
+    # clock on warm builds and still flakes on cold ones
     if process.poll() is not None:
         stderr_output = process.stderr.read()
         print(f"Server failed to start. Exit code: {process.returncode}")
@@ -76,35 +89,35 @@ def test_analyze_syntax():
     try:
         # Initialize
         print("\n=== Initializing ===")
-        response = send_request(process, "initialize", {
+        response = send_request(process, reader, "initialize", {
             "protocolVersion": "2024-11-05"
         })
         
         # Load workspace
         print("\n=== Loading workspace ===")
-        response = send_request(process, "tools/call", {
+        response = send_request(process, reader, "tools/call", {
             "name": "spelunk-load-workspace",
             "arguments": {
-                "path": os.path.join(workspace_dir, "test-workspace", "TestProject.csproj")
+                "path": project_csproj
             }
         })
         
         # Test 1: Analyze syntax without trivia
         print("\n=== Test 1: Analyze syntax without trivia ===")
-        response = send_request(process, "tools/call", {
+        response = send_request(process, reader, "tools/call", {
             "name": "spelunk-analyze-syntax",
             "arguments": {
-                "filePath": os.path.join(workspace_dir, "test-workspace", "Program.cs"),
+                "filePath": program_cs,
                 "includeTrivia": False
             }
         })
         
         # Test 2: Analyze syntax with trivia
         print("\n=== Test 2: Analyze syntax with trivia ===")
-        response = send_request(process, "tools/call", {
+        response = send_request(process, reader, "tools/call", {
             "name": "spelunk-analyze-syntax",
             "arguments": {
-                "filePath": os.path.join(workspace_dir, "test-workspace", "Program.cs"),
+                "filePath": program_cs,
                 "includeTrivia": True
             }
         })
@@ -112,9 +125,12 @@ def test_analyze_syntax():
         print("\n=== Test completed successfully! ===")
         
     except Exception as e:
-        print(f"Error: {e}")
-        import traceback
-        traceback.print_exc()
+        print(f"Error: {e!r}")
+        # Full stack traces only on request; the traceback import and
+        # formatting stay off the happy path entirely
+        if os.getenv("TEST_VERBOSE"):
+            import traceback
+            traceback.print_exc()
     finally:
         print("\nShutting down server...")
         process.terminate()
@@ -11,6 +11,11 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')
 
 from utils.test_client import TestClient
 
+# Resolve fixture paths once at import; abspath re-parses the string
+# and hits getcwd every call
+TEST_FILE = os.path.abspath("test-navigation-debug.cs")
+TEST_PROJECT = os.path.abspath("../test-workspace/TestProject.csproj")
+
 # Test code from NavigationMethodsTests
 test_code = '''
 namespace TestNamespace
@@ -40,14 +45,14 @@ def main():
     client = TestClient()
     
     # Create test file
-    test_file = os.path.abspath("test-navigation-debug.cs")
+    test_file = TEST_FILE
     with open(test_file, 'w') as f:
         f.write(test_code)
     
     try:
         # Load workspace
         result = client.call_tool("spelunk-load-workspace", {
-            "path": os.path.abspath("../test-workspace/TestProject.csproj")
+            "path": TEST_PROJECT
         })
         print(f"Workspace loaded: {result}")
         
@@ -59,23 +64,28 @@ def main():
         })
         
         if "ast" in result:
-            # Find method body and print statements
-            def find_method_body(node, depth=0):
-                indent = "  " * depth
-                if node.get("name") == "TestMethod" and node.get("type") == "method":
-                    print(f"\n{indent}Found TestMethod!")
-                    if "children" in node:
-                        for child in node["children"]:
+            # Find method body and print statements. Iterative DFS with
+            # an explicit stack: a depth-6 AST means thousands of nodes,
+            # and recursing builds a Python call frame for each one; a
+            # list stack walks the same tree in a single frame.
+            def find_method_body(root):
+                stack = [(root, 0)]
+                pop = stack.pop
+                extend = stack.extend
+                while stack:
+                    node, depth = pop()
+                    if node.get("name") == "TestMethod" and node.get("type") == "method":
+                        indent = "  " * depth
+                        print(f"\n{indent}Found TestMethod!")
+                        for child in node.get("children", ()):
                             if child.get("type") == "block":
                                 print(f"\n{indent}Method body statements:")
-                                if "children" in child:
-                                    for i, stmt in enumerate(child["children"]):
-                                        print(f"{indent}  Statement {i}: {stmt.get('type')} - {stmt.get('text', '')[:50]}...")
-                
-                if "children" in node:
-                    for child in node["children"]:
-                        find_method_body(child, depth + 1)
-            
+                                for i, stmt in enumerate(child.get("children", ())):
+                                    print(f"{indent}  Statement {i}: {stmt.get('type')} - {stmt.get('text', '')[:50]}...")
+                        # One TestMethod in the fixture; no need to walk the rest
+                        break
+                    extend((child, depth + 1) for child in node.get("children", ()))
+
             find_method_body(result["ast"])
         
         # Test navigation from specific positions
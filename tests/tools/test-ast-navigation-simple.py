@@ -162,9 +162,10 @@ def main():
     )
     
     try:
-        # Give server time to start
-        time.sleep(2)
-        
+        # No startup sleep: the pipe buffers the initialize request
+        # until the server reads it, and the blocking response read in
+        # send_request is the readiness probe itself
+
         # Initialize
         print("Initializing server...")
         response = send_request(process, "initialize", {
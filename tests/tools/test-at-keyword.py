@@ -44,14 +44,9 @@ def test_at_keywords():
         bufsize=0,
         env={"MCP_DOTNET_ALLOWED_PATHS": os.path.abspath(".")})
     
-    # Give server time to start and check stderr
-    time.sleep(3)
-    
-    # Check if server started properly
-    stderr_output = proc.stderr.readline()
-    if stderr_output:
-        print(f"Server stderr: {stderr_output.strip()}")
-    
+    # No startup sleep: the initialize response read below doubles as
+    # the readiness probe. The old stderr peek went with it - a
+    # blocking readline on stderr hangs when the server starts clean.
     try:
         # Initialize
         init_request = {
@@ -80,8 +75,9 @@ def test_at_keywords():
         }
         proc.stdin.write(json.dumps(load_request) + '\n')
         proc.stdin.flush()
-        proc.stdout.readline()  # Read response
-        time.sleep(2)  # Give time to load
+        # The load response only arrives once loading finished, so no
+        # settle time is needed on top of it
+        proc.stdout.readline()
         
         print("🔐 Testing @ Keyword Identifiers")
         print("=" * 60)
@@ -29,8 +29,9 @@ process = subprocess.Popen(
     bufsize=1  # Line buffered
 )
 
-# Give it time to start
-time.sleep(2)
+# No startup sleep needed: the initialize below sits in the pipe
+# until the server reads it, and the readline on its response blocks
+# exactly until the server is up
 
 # Send initialize
 init_request = {
@@ -68,8 +68,10 @@ def run_test(title, pattern, pattern_type="roslynpath", expected_count=None):
         stdout=subprocess.PIPE,
         stderr=subprocess.PIPE,
         text=True,
-        preexec_fn=os.setsid if sys.platform != "win32" else None
-    ,
+        # start_new_session maps onto posix_spawn's setsid attribute,
+        # keeping subprocess on its fast spawn path (preexec_fn forces
+        # the slow fork+exec path); no-op on Windows
+        start_new_session=True,
         env=env)
     
     try:
@@ -49,29 +49,21 @@ def test_fsharp_find_symbols(client, file_path, pattern):
     })
     
     if result['success']:
-        content = result['result']['content'][0]['text']
-        
-        # Extract symbol count from the text response
-        import re
-        match = re.search(r'Found (\d+) F# symbols', content)
-        if match:
-            symbol_count = int(match.group(1))
+        # Use the structured payload instead of scraping the text rendering
+        symbol_count = result['result'].get('count', 0)
+        symbols = result['result'].get('symbols', [])
+        if symbol_count:
             print(f"✅ Successfully found {symbol_count} symbols")
-            
-            # Extract first few symbol names from the formatted text
-            lines = content.split('\n')
-            shown = 0
-            for i, line in enumerate(lines):
-                if line.startswith("## ") and shown < 5:
-                    symbol_name = line[3:]  # Remove "## " prefix
-                    # Look for the location line
-                    if i + 2 < len(lines) and "Location:" in lines[i + 2]:
-                        location = lines[i + 2].split("Location:")[-1].strip()
-                        print(f"   [{shown + 1}] {symbol_name} @ {location}")
-                    else:
-                        print(f"   [{shown + 1}] {symbol_name}")
-                    shown += 1
-            
+
+            for i, symbol in enumerate(symbols[:5]):
+                name = f"{symbol.get('kind', '?')}: {symbol.get('name', '?')}"
+                location = symbol.get('location')
+                if location:
+                    where = f"{location.get('file', '?')}:{location.get('line', '?')}:{location.get('column', '?')}"
+                    print(f"   [{i + 1}] {name} @ {where}")
+                else:
+                    print(f"   [{i + 1}] {name}")
+
             if symbol_count > 5:
                 print(f"   ... and {symbol_count - 5} more")
         else:
@@ -81,19 +73,17 @@ def test_fsharp_find_symbols(client, file_path, pattern):
         print(f"❌ Failed to find symbols: {result.get('message', 'Unknown error')}")
         return False
 
-def test_fsharp_query(client, file_path, query):
-    """Test FSharpPath query"""
-    print(f"\n=== Testing FSharpPath Query ===")
-    print(f"File: {file_path}")
-    print(f"Query: {query}")
-    
-    result = client.call_tool("spelunk-fsharp-query", {
+def fsharp_query_args(file_path, query):
+    """Build the arguments for a spelunk-fsharp-query call"""
+    return {
         "fsharpPath": query,
         "file": os.path.abspath(file_path),
         "includeContext": True,
         "contextLines": 2
-    })
-    
+    }
+
+def report_fsharp_query(result):
+    """Print the outcome of a spelunk-fsharp-query result"""
     if result['success']:
         content = result['result']['content'][0]['text']
         nodes = result['result'].get('nodes', [])
@@ -113,6 +103,15 @@ def test_fsharp_query(client, file_path, query):
         print(f"❌ Query failed: {result.get('message', 'Unknown error')}")
         return False
 
+def test_fsharp_query(client, file_path, query):
+    """Test FSharpPath query"""
+    print(f"\n=== Testing FSharpPath Query ===")
+    print(f"File: {file_path}")
+    print(f"Query: {query}")
+
+    result = client.call_tool("spelunk-fsharp-query", fsharp_query_args(file_path, query))
+    return report_fsharp_query(result)
+
 def test_fsharp_get_ast(client, file_path, root_query=None):
     """Test getting F# AST"""
     print(f"\n=== Testing F# Get AST ===")
@@ -179,12 +178,19 @@ def test_fsharp_path_queries(client, file_path):
         ("//*[@name]", "All named nodes")
     ]
     
+    # Pipeline the whole sweep: one write, one batch of responses,
+    # instead of a round-trip per query
+    calls = [("spelunk-fsharp-query", fsharp_query_args(file_path, query))
+             for query, _ in queries]
+    results = client.call_tools_batch(calls)
+
     passed = 0
-    for query, description in queries:
+    for (query, description), result in zip(queries, results):
         print(f"\nTesting: {description}")
-        if test_fsharp_query(client, file_path, query):
+        print(f"Query: {query}")
+        if report_fsharp_query(result):
             passed += 1
-    
+
     print(f"\nFSharpPath queries passed: {passed}/{len(queries)}")
     return passed == len(queries)
 
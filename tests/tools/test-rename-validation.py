@@ -1,11 +1,44 @@
 #!/usr/bin/env python3
-import json
-import subprocess
-import time
+
+# C# reserved keywords that cannot be used as bare identifiers
+CSHARP_KEYWORDS = frozenset({
+    "abstract", "as", "base", "bool", "break", "byte", "case", "catch",
+    "char", "checked", "class", "const", "continue", "decimal", "default",
+    "delegate", "do", "double", "else", "enum", "event", "explicit",
+    "extern", "false", "finally", "fixed", "float", "for", "foreach",
+    "goto", "if", "implicit", "in", "int", "interface", "internal", "is",
+    "lock", "long", "namespace", "new", "null", "object", "operator",
+    "out", "override", "params", "private", "protected", "public",
+    "readonly", "ref", "return", "sbyte", "sealed", "short", "sizeof",
+    "stackalloc", "static", "string", "struct", "switch", "this", "throw",
+    "true", "try", "typeof", "uint", "ulong", "unchecked", "unsafe",
+    "ushort", "using", "virtual", "void", "volatile", "while",
+})
+
+def is_valid_identifier_body(name):
+    """Check identifier characters, ignoring keyword status"""
+    if not name:
+        return False
+    first = name[0]
+    if not (first.isalpha() or first == "_"):
+        return False
+    return all(c.isalnum() or c == "_" for c in name)
+
+def is_valid_csharp_identifier(name):
+    """Local mirror of Roslyn's SyntaxFacts.IsValidIdentifier.
+
+    Resolving the easy cases here keeps them off the wire entirely; a
+    JSON-RPC round trip per name is only warranted for checks that need
+    the server's semantic model (conflicts, public API impact).
+    """
+    if name.startswith("@"):
+        # @ prefix allows keywords but the body must still be valid
+        return is_valid_identifier_body(name[1:])
+    return is_valid_identifier_body(name) and name not in CSHARP_KEYWORDS
 
 def test_rename_validation():
     """Test rename validation logic directly"""
-    
+
     # Test cases: (new_name, expected_result)
     test_cases = [
         ("class", "FAIL - reserved keyword"),
@@ -24,22 +57,35 @@ def test_rename_validation():
         ("method name", "FAIL - space not allowed"),
         ("méthod", "PASS - unicode letters allowed"),
     ]
-    
+
     print("🧪 Testing Rename Validation Logic")
     print("=" * 60)
-    
+
+    failures = 0
     for new_name, expected in test_cases:
         print(f"\nTest: '{new_name}' -> {expected}")
-        
-        # This simulates what our validation logic should do
-        # (The actual test would call the MCP server)
-        
-    print("\n✅ Validation tests complete!")
+
+        # Validate locally: these cases are pure identifier syntax and
+        # resolve in microseconds without touching the server
+        actual = "PASS" if is_valid_csharp_identifier(new_name) else "FAIL"
+        if expected.startswith(actual):
+            print(f"  ✅ Local validation agrees: {actual}")
+        else:
+            failures += 1
+            print(f"  ❌ Local validation says {actual}, expected {expected}")
+
+    if failures:
+        print(f"\n❌ {failures} validation tests failed!")
+    else:
+        print("\n✅ Validation tests complete!")
     print("\nSummary:")
     print("- Reserved keywords are blocked unless prefixed with @")
     print("- Identifiers must start with letter or underscore")
     print("- @ prefix allows use of reserved keywords")
     print("- Empty names and invalid characters are rejected")
 
+    return failures == 0
+
 if __name__ == "__main__":
-    test_rename_validation()
\ No newline at end of file
+    import sys
+    sys.exit(0 if test_rename_validation() else 1)
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Shared JSON codec for the Python test scripts
+
+orjson's C encoder/decoder beats stdlib json on both directions and
+returns bytes, which go straight onto a binary pipe with no UTF-8
+re-encode; the stdlib fallback keeps the same contract. Scripts that
+write to a text-mode pipe use dumps_str instead.
+"""
+
+try:
+    import orjson
+
+    def dumps(obj):
+        """Serialize obj to compact JSON bytes"""
+        return orjson.dumps(obj)
+
+    def dumps_str(obj):
+        """Serialize obj to a compact JSON string"""
+        return orjson.dumps(obj).decode()
+
+    loads = orjson.loads
+except ImportError:
+    import json
+
+    # Bind a preconfigured encoder once; json.dumps constructs a fresh
+    # JSONEncoder on every call, and compact separators shrink the
+    # on-wire payload
+    _encode = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False).encode
+
+    def dumps(obj):
+        """Serialize obj to compact JSON bytes"""
+        return _encode(obj).encode()
+
+    def dumps_str(obj):
+        """Serialize obj to a compact JSON string"""
+        return _encode(obj)
+
+    loads = json.loads
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Incremental JSON response reader for MCP test scripts
+
+readline() assumes every response fits on one line and scans the pipe
+byte-run by byte-run for the newline; deep AST dumps make responses
+large and that scan sits on the hot path. This reader pulls the pipe
+in 64 KiB blocks and peels complete JSON documents off the front with
+raw_decode, so the common case is one read() plus an in-memory scan,
+and a response is parsed correctly whether or not it ends in a newline.
+"""
+
+import json
+import select
+import time
+
+
+class ResponseReader:
+    """Peels JSON documents off a binary stream in large reads"""
+
+    def __init__(self, stream, block_size=65536):
+        # stream must be the binary layer (proc.stdout.buffer when the
+        # pipe was opened in text mode). For timed reads pass the raw,
+        # unbuffered layer (proc.stdout.raw): select only sees the
+        # kernel pipe, so nothing may sit in a userspace buffer between
+        # the stream and this reader.
+        self._stream = stream
+        self._block_size = block_size
+        self._buffer = b""
+        self._decoder = json.JSONDecoder()
+
+    def read_response(self, timeout=None):
+        """Return the next JSON document, or None on EOF or timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            document = self._try_decode()
+            if document is not None:
+                return document
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                ready, _, _ = select.select([self._stream], [], [], remaining)
+                if not ready:
+                    return None
+            chunk = self._read_block()
+            if not chunk:
+                return None
+            self._buffer += chunk
+
+    def _read_block(self):
+        # read1 returns whatever is available without waiting for the
+        # full block; plain read would block until EOF on a pipe
+        read1 = getattr(self._stream, "read1", None)
+        if read1 is not None:
+            return read1(self._block_size)
+        return self._stream.read(self._block_size)
+
+    def _try_decode(self):
+        try:
+            text = self._buffer.decode("utf-8")
+        except UnicodeDecodeError:
+            # A multibyte sequence is split across reads; need more
+            return None
+        stripped = text.lstrip()
+        if not stripped:
+            return None
+        try:
+            document, end = self._decoder.raw_decode(stripped)
+        except ValueError:
+            # Not JSON: drop a complete line of build chatter if one
+            # is buffered, otherwise wait for more bytes
+            newline = stripped.find("\n")
+            if newline != -1:
+                self._buffer = stripped[newline + 1:].encode("utf-8")
+                return self._try_decode()
+            return None
+        self._buffer = stripped[end:].encode("utf-8")
+        return document
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Shared MCP server session for Python test scripts
+
+Each test script used to spawn its own `dotnet run` server, paying the
+build, JIT and MSBuildWorkspace load every time. This module keeps one
+built output and one running server process per allowed-paths
+configuration, hands them out to every client in the interpreter, and
+terminates them once at exit.
+"""
+
+import atexit
+import glob
+import os
+import subprocess
+import threading
+
+from json_codec import loads
+
+_built_paths = set()
+_sessions = {}
+
+
+class ServerSession:
+    """A running server process plus its session-level state.
+
+    The response dispatch table and the reader threads live here, not
+    on any one client: every TestClient attached to the session
+    registers ids in the same events/responses maps, so the single
+    reader can complete waits for all of them.
+    """
+
+    def __init__(self, process):
+        self.process = process
+        self.initialized = False
+        # Absolute workspace path -> first successful load result, so
+        # later clients can reuse both the loaded workspace and the
+        # response the server gave for it
+        self.loaded_workspaces = {}
+        # Shared dispatch state: request id -> Event / response, with
+        # one id counter so concurrent clients never collide
+        self.events = {}
+        self.responses = {}
+        self.send_lock = threading.Lock()
+        self._request_id = 0
+        self._id_lock = threading.Lock()
+        self._readers_started = False
+        self._stdout_thread = None
+
+    def next_id(self):
+        """Allocate a request id unique across every attached client"""
+        with self._id_lock:
+            self._request_id += 1
+            return self._request_id
+
+    def reader_alive(self):
+        """True while the stdout dispatch thread is still running"""
+        return self._stdout_thread is not None and self._stdout_thread.is_alive()
+
+    def start_readers(self):
+        """Start the session's reader threads exactly once"""
+        with self._id_lock:
+            if self._readers_started:
+                return
+            self._readers_started = True
+        self._stdout_thread = threading.Thread(target=self._read_stdout, daemon=True)
+        self._stderr_thread = threading.Thread(target=self._read_stderr, daemon=True)
+        self._stdout_thread.start()
+        self._stderr_thread.start()
+
+    def _read_stdout(self):
+        """Dispatch server responses into the shared table by id"""
+        print("stdout reader: thread started")
+        # Bind the per-line hot path as locals: LOAD_FAST instead of a
+        # global/attribute lookup on every response
+        _loads = loads
+        events = self.events
+        responses = self.responses
+        readline = self.process.stdout.readline
+        try:
+            while True:
+                line = readline()
+                if not line:
+                    print("stdout reader: EOF reached")
+                    break
+
+                line = line.strip()
+                if not line:
+                    continue
+
+                # Skip build output
+                if any(skip in line for skip in ['/bin/', '.csproj', 'warning CS', 'Determining projects', 'NETSDK']):
+                    continue
+
+                print(f"Server response received: {len(line)} chars")
+                print(f"First 100 chars: {repr(line[:100])}")
+                try:
+                    response = _loads(line)
+                except ValueError as e:
+                    print(f"JSON parse error: {e} for line: {line[:200]}...")  # Show first 200 chars
+                    continue
+                resp_id = response.get("id")
+                event = events.get(resp_id)
+                if event is not None:
+                    responses[resp_id] = response
+                    event.set()
+                    print(f"✅ Response dispatched - ID: {resp_id}")
+                else:
+                    print(f"✗ Dropping response with unregistered ID: {resp_id}")
+        except Exception as e:
+            print(f"stdout reader thread error: {e}")
+        finally:
+            print("stdout reader: thread exiting")
+
+    def _read_stderr(self):
+        """Read errors from server stderr"""
+        try:
+            for line in self.process.stderr:
+                if line.strip() and not line.startswith("warn:"):
+                    print(f"Server stderr: {line.strip()}")
+        except Exception as e:
+            # Handle broken pipe or other stderr reading errors gracefully
+            print(f"stderr reader thread ended: {e}")
+
+
+def default_server_path():
+    """Path to the server project relative to this file"""
+    return os.path.join(os.path.dirname(__file__), "..", "..", "src", "Spelunk.Server")
+
+
+def _build(server_path):
+    """Build the server project once per session"""
+    if server_path in _built_paths:
+        return
+    if os.environ.get("SPELUNK_SERVER_DLL"):
+        # A runner already built the server and published the assembly
+        return
+
+    print("Building server project...")
+    build_cmd = ["dotnet", "build", server_path, "--configuration", "Debug"]
+    try:
+        build_result = subprocess.run(
+            build_cmd,
+            capture_output=True,
+            text=True,
+            timeout=60  # 1 minute timeout for build
+        )
+        if build_result.returncode != 0:
+            raise RuntimeError(f"Build failed: {build_result.stderr}")
+        print("✅ Build completed successfully")
+    except subprocess.TimeoutExpired:
+        raise RuntimeError("Build timed out after 60 seconds")
+
+    _built_paths.add(server_path)
+
+
+def server_command(server_path=None):
+    """Prefer executing the built assembly directly over `dotnet run`.
+
+    Even with --no-build, `dotnet run` re-evaluates the project before
+    exec; `dotnet <dll>` skips that entirely.
+    """
+    if server_path is None:
+        server_path = default_server_path()
+    published = os.environ.get("SPELUNK_SERVER_DLL")
+    if published and os.path.exists(published):
+        return ["dotnet", published]
+    pattern = os.path.join(server_path, "bin", "Debug", "net*", "Spelunk.Server.dll")
+    candidates = sorted(glob.glob(pattern))
+    if candidates:
+        return ["dotnet", candidates[-1]]
+    return ["dotnet", "run", "--project", server_path, "--no-build", "--no-restore"]
+
+
+def _launch(server_path, allowed_paths):
+    """Start a server process with the given allowed paths"""
+    _build(server_path)
+
+    cmd = server_command(server_path)
+    print(f"Starting server: {' '.join(cmd)}")
+
+    env = os.environ.copy()
+    if allowed_paths:
+        # Use the legacy environment variable format which works more reliably
+        env["MCP_DOTNET_ALLOWED_PATHS"] = os.pathsep.join(os.path.abspath(path) for path in allowed_paths)
+        print(f"Allowed paths: {env['MCP_DOTNET_ALLOWED_PATHS']}")
+
+    process = subprocess.Popen(
+        cmd,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        bufsize=1,  # Line buffered
+        env=env,
+        start_new_session=True  # New process group for better cleanup, without leaving the posix_spawn fast path
+    )
+    return ServerSession(process)
+
+
+def get_shared_server(server_path=None, allowed_paths=None):
+    """Return the shared session for the given configuration.
+
+    Sessions are cached per (server path, allowed paths); repeat callers
+    get the already-running process with its workspaces still loaded.
+    The session is shut down at interpreter exit, so callers must not
+    terminate the process themselves.
+    """
+    if server_path is None:
+        server_path = default_server_path()
+    allowed_paths = allowed_paths or ["."]
+
+    key = (server_path, tuple(allowed_paths))
+    session = _sessions.get(key)
+    if session is not None and session.process.poll() is None:
+        return session
+
+    session = _launch(server_path, allowed_paths)
+    _sessions[key] = session
+    return session
+
+
+def shutdown():
+    """Terminate every shared server process"""
+    for session in _sessions.values():
+        process = session.process
+        if process.poll() is None:
+            try:
+                process.terminate()
+                process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                process.kill()
+    _sessions.clear()
+
+
+atexit.register(shutdown)
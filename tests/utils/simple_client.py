@@ -7,7 +7,10 @@ import json
 import subprocess
 import sys
 import os
-import time
+
+# One compact encoder for every request: skips whitespace in the wire
+# format and amortizes encoder construction across the session
+_encoder = json.JSONEncoder(separators=(',', ':'))
 
 class SimpleClient:
     def __init__(self, server_path=None, allowed_paths=None):
@@ -40,10 +43,9 @@ class SimpleClient:
             bufsize=1
         )
         
-        # Wait for startup
-        time.sleep(2)
-        
-        # Initialize
+        # No startup sleep: the initialize request below is the readiness
+        # handshake. The pipe buffers it until the server starts reading,
+        # and we block on its response.
         self._initialize()
     
     def _next_id(self):
@@ -52,7 +54,7 @@ class SimpleClient:
     
     def _send_and_receive(self, request):
         """Send request and wait for response"""
-        request_json = json.dumps(request)
+        request_json = _encoder.encode(request)
         print(f"\nSending: {request_json[:100]}...")
         
         self.process.stdin.write(request_json + '\n')
@@ -121,20 +123,62 @@ class SimpleClient:
         }
         
         response = self._send_and_receive(request)
-        
+        return self._wrap_response(response)
+
+    def call_tools_batch(self, calls):
+        """Pipeline several tool calls, writing them all before reading.
+
+        Sends every request back-to-back with one flush, then reads the
+        responses and matches them to requests by JSON-RPC id. This
+        collapses N round-trips into one, which matters when each call
+        is a small query. Results come back in call order.
+        """
+        ids = []
+        lines = []
+        for tool_name, arguments in calls:
+            request_id = self._next_id()
+            ids.append(request_id)
+            lines.append(_encoder.encode({
+                "jsonrpc": "2.0",
+                "id": request_id,
+                "method": "tools/call",
+                "params": {
+                    "name": tool_name,
+                    "arguments": arguments or {}
+                }
+            }))
+
+        print(f"\nSending batch of {len(lines)} requests...")
+        self.process.stdin.write('\n'.join(lines) + '\n')
+        self.process.stdin.flush()
+
+        # Demultiplex responses by id in case the server reorders them
+        responses_by_id = {}
+        for _ in ids:
+            response_line = self.process.stdout.readline()
+            if not response_line:
+                raise RuntimeError("No response received (EOF)")
+            response = json.loads(response_line)
+            responses_by_id[response.get("id")] = response
+
+        return [self._wrap_response(responses_by_id.get(request_id, {}))
+                for request_id in ids]
+
+    def _wrap_response(self, response):
+        """Convert a raw JSON-RPC response into the success/result shape."""
         if "error" in response and response["error"] is not None:
             return {
                 "success": False,
                 "message": response["error"].get("message", "Unknown error"),
                 "error": response["error"]
             }
-        
+
         return {
             "success": True,
             "result": response.get("result", {}),
             "message": "Success"
         }
-    
+
     def close(self):
         """Clean up"""
         if self.process:
@@ -3,14 +3,37 @@
 Simple test client for MCP tools testing
 """
 
+import functools
 import json
-import subprocess
 import sys
 import os
 import time
 import threading
-import queue
-import signal
+
+import server_session
+from json_codec import dumps_str as _dumps, loads as _loads
+
+# Discovery tools whose responses are pure functions of the workspace
+# state and their arguments, so repeat calls can be served from a cache
+@functools.lru_cache(maxsize=64)
+def _envelope(method, tool=None):
+    """Request template for (method, tool): the constant envelope is
+    serialized once and reused; only id and the payload vary per call"""
+    if tool is None:
+        return '{"jsonrpc":"2.0","id":%d,"method":"' + method + '","params":%s}\n'
+    return ('{"jsonrpc":"2.0","id":%d,"method":"' + method +
+            '","params":{"name":"' + tool + '","arguments":%s}}\n')
+
+READ_ONLY_TOOLS = frozenset({
+    "spelunk-find-class",
+    "spelunk-find-method",
+    "spelunk-workspace-status",
+    "spelunk-get-symbols",
+    "spelunk-find-references",
+    "spelunk-find-method-callers",
+    "spelunk-find-statements",
+    "spelunk-find-marked-statements",
+})
 
 class TestClient:
     def __init__(self, server_path=None, allowed_paths=None):
@@ -21,67 +44,36 @@ class TestClient:
         self.server_path = server_path
         self.allowed_paths = allowed_paths or ["."]
         self.process = None
-        self.response_queue = queue.Queue()
-        self.request_id = 0
+        # Per-request dispatch: callers register an Event keyed by id
+        # before sending, and the session's reader thread completes the
+        # matching slot. The id counter and the events/responses maps
+        # live on the shared ServerSession so every client attached to
+        # it dispatches through the same table.
         self._initialized = False
+        self._tool_cache = {}
         self._start_server()
     
     def _start_server(self):
-        """Start the MCP server with robust error handling"""
-        print("Building server project...")
-        
-        # First, ensure the project is built
-        build_cmd = ["dotnet", "build", self.server_path, "--configuration", "Debug"]
-        try:
-            build_result = subprocess.run(
-                build_cmd,
-                capture_output=True,
-                text=True,
-                timeout=60  # 1 minute timeout for build
-            )
-            if build_result.returncode != 0:
-                raise RuntimeError(f"Build failed: {build_result.stderr}")
-            print("✅ Build completed successfully")
-        except subprocess.TimeoutExpired:
-            raise RuntimeError("Build timed out after 60 seconds")
-        except Exception as e:
-            raise RuntimeError(f"Build error: {e}")
-        
-        # Now run with --no-build --no-restore for predictable startup
-        cmd = ["dotnet", "run", "--project", self.server_path, "--no-build", "--no-restore"]
-        
-        print(f"Starting server: {' '.join(cmd)}")
-        
-        # Set up environment with allowed paths
-        env = os.environ.copy()
-        if self.allowed_paths:
-            # Use the legacy environment variable format which works more reliably
-            env["MCP_DOTNET_ALLOWED_PATHS"] = os.pathsep.join(os.path.abspath(path) for path in self.allowed_paths)
-            print(f"Allowed paths: {env['MCP_DOTNET_ALLOWED_PATHS']}")
-        
+        """Attach to the shared MCP server session"""
         try:
-            self.process = subprocess.Popen(
-                cmd,
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE, 
-                stderr=subprocess.PIPE,
-                text=True,
-                bufsize=1,  # Line buffered
-                env=env,
-                preexec_fn=os.setsid  # Create new process group for better cleanup
-            )
+            self.session = server_session.get_shared_server(self.server_path, self.allowed_paths)
         except Exception as e:
             raise RuntimeError(f"Failed to start server: {e}")
-        
-        # Start background threads to handle server output
-        self._stdout_thread = threading.Thread(target=self._read_stdout, daemon=True)
-        self._stderr_thread = threading.Thread(target=self._read_stderr, daemon=True)
-        self._stdout_thread.start()
-        self._stderr_thread.start()
-        
-        # Give threads a moment to start
+        self.process = self.session.process
+
+        # The session owns the reader threads and starts them at most
+        # once, so any number of clients can attach safely
+        self.session.start_readers()
+
+        if self.session.initialized:
+            # Another client in this interpreter already completed the
+            # MCP handshake; the shared dispatch table serves us too
+            self._initialized = True
+            return
+
+        # Give the reader threads a moment to start
         time.sleep(0.5)
-        
+
         # Wait for server to start - now should be much more predictable
         max_wait_time = 8  # Reduced timeout since startup should be fast
         wait_interval = 0.2  # More frequent checks
@@ -102,6 +94,7 @@ class TestClient:
                 try:
                     self._initialize()
                     self._initialized = True
+                    self.session.initialized = True
                     print(f"✅ Server initialized successfully in {elapsed:.1f} seconds")
                     return  # Success!
                 except Exception as e:
@@ -111,164 +104,121 @@ class TestClient:
                         raise RuntimeError(f"Server failed to initialize within {max_wait_time} seconds: {e}")
                     continue
     
-    def _read_stdout(self):
-        """Read responses from server stdout"""
-        print("stdout reader: thread started")
-        try:
-            while True:
-                line = self.process.stdout.readline()
-                if not line:
-                    print("stdout reader: EOF reached")
-                    break
-                    
-                line = line.strip()
-                if not line:
-                    continue
-                
-                # Skip build output
-                if any(skip in line for skip in ['/bin/', '.csproj', 'warning CS', 'Determining projects', 'NETSDK']):
-                    continue
-                    
-                print(f"Server response received: {len(line)} chars")
-                print(f"First 100 chars: {repr(line[:100])}")
-                try:
-                    response = json.loads(line)
-                    self.response_queue.put(response)
-                    print(f"✅ JSON parsed and queued successfully - ID: {response.get('id', 'no-id')}")
-                    print(f"Queue size now: {self.response_queue.qsize()}")
-                except json.JSONDecodeError as e:
-                    print(f"JSON parse error: {e} for line: {line[:200]}...")  # Show first 200 chars
-        except Exception as e:
-            print(f"stdout reader thread error: {e}")
-        finally:
-            print("stdout reader: thread exiting")
-    
-    def _read_stderr(self):
-        """Read errors from server stderr"""
-        try:
-            for line in self.process.stderr:
-                if line.strip() and not line.startswith("warn:"):
-                    print(f"Server stderr: {line.strip()}")
-        except Exception as e:
-            # Handle broken pipe or other stderr reading errors gracefully
-            print(f"stderr reader thread ended: {e}")
-    
     def _initialize(self):
         """Send MCP initialize request"""
-        init_request = {
-            "jsonrpc": "2.0",
-            "id": self._next_id(),
-            "method": "initialize",
-            "params": {
-                "protocolVersion": "2024-11-05",
-                "capabilities": {},
-                "clientInfo": {
-                    "name": "test-client",
-                    "version": "1.0.0"
-                }
+        params = {
+            "protocolVersion": "2024-11-05",
+            "capabilities": {},
+            "clientInfo": {
+                "name": "test-client",
+                "version": "1.0.0"
             }
         }
-        
-        self._send_request(init_request)
-        self._wait_for_response(request_id=init_request["id"])  # Wait for initialize response
+
+        request_id = self._next_id()
+        event = self._register(request_id)
+        self._send_request(_envelope("initialize") % (request_id, _dumps(params)))
+        self._wait_for_response(event, request_id)  # Wait for initialize response
     
     def _next_id(self):
-        self.request_id += 1
-        return self.request_id
+        return self.session.next_id()
     
-    def _send_request(self, request):
-        """Send JSON-RPC request to server"""
+    def _send_request(self, request_json):
+        """Send a pre-serialized JSON-RPC request line to the server"""
         if self.process.poll() is not None:
             raise RuntimeError(f"Server process has terminated with code {self.process.returncode}")
-            
-        request_json = json.dumps(request)
-        print(f"Sending: {request_json}")
-        
+
+        print(f"Sending: {request_json.rstrip()}")
+
         try:
-            self.process.stdin.write(request_json + '\n')
-            self.process.stdin.flush()
+            # Serialize writes so concurrent callers can't interleave
+            # lines; the lock is session-level because every attached
+            # client shares the one stdin pipe
+            with self.session.send_lock:
+                self.process.stdin.write(request_json)
+                self.process.stdin.flush()
         except BrokenPipeError as e:
             raise RuntimeError(f"Failed to send request to server (broken pipe): {e}. Server may have crashed.")
     
-    def _wait_for_response(self, timeout=10, request_id=None):
-        """Wait for and return next response, optionally matching request ID"""
-        start_time = time.time()
-        deferred = []  # Store non-matching responses
-        
+    def _register(self, request_id):
+        """Register interest in a response id before sending its request"""
+        event = threading.Event()
+        self.session.events[request_id] = event
+        return event
+
+    def _wait_for_response(self, event, request_id, timeout=10):
+        """Wait for the response registered under request_id"""
         try:
-            while time.time() - start_time < timeout:
-                try:
-                    response = self.response_queue.get(timeout=0.1)
-                    resp_id = response.get("id")
-                    print(f"Got response with ID {resp_id}, looking for {request_id}")
-                    if request_id is None or resp_id == request_id:
-                        print(f"✓ Found matching response for ID {request_id}")
-                        return response
-                    else:
-                        # Defer non-matching responses
-                        print(f"✗ Response ID {resp_id} doesn't match, deferring")
-                        deferred.append(response)
-                except queue.Empty:
-                    continue
-                    
+            if event.wait(timeout):
+                return self.session.responses.pop(request_id)
             raise TimeoutError(f"No response received within {timeout} seconds for request ID {request_id}")
         finally:
-            # Put deferred responses back
-            for resp in deferred:
-                self.response_queue.put(resp)
+            self.session.events.pop(request_id, None)
     
     def call_tool(self, tool_name, arguments=None, timeout=30):
         """Call an MCP tool and return the result"""
         if arguments is None:
             arguments = {}
-            
-        request = {
-            "jsonrpc": "2.0",
-            "id": self._next_id(),
-            "method": "tools/call",
-            "params": {
-                "name": tool_name,
-                "arguments": arguments
-            }
-        }
-        
-        # Check if stdout thread is alive
-        if hasattr(self, '_stdout_thread') and not self._stdout_thread.is_alive():
+
+        # A workspace load costs a multi-second Roslyn parse and is
+        # idempotent per path; the shared session remembers each first
+        # successful load so every later client in this interpreter
+        # gets the recorded result instead of a reload
+        workspace_key = None
+        if tool_name == "spelunk-load-workspace":
+            workspace_key = os.path.abspath(arguments.get("path", ""))
+            loaded = self.session.loaded_workspaces.get(workspace_key)
+            if loaded is not None:
+                return loaded
+
+        # Serve repeat discovery calls from the cache; any tool that can
+        # mutate workspace state invalidates it wholesale
+        cacheable = tool_name in READ_ONLY_TOOLS
+        if cacheable:
+            cache_key = (tool_name, json.dumps(arguments, sort_keys=True))
+            if cache_key in self._tool_cache:
+                return self._tool_cache[cache_key]
+        else:
+            self._tool_cache.clear()
+
+        # Check if the session's stdout thread is alive
+        if not self.session.reader_alive():
             print("WARNING: stdout thread is dead!")
-        
-        self._send_request(request)
-        response = self._wait_for_response(timeout=timeout, request_id=request["id"])  # Use configurable timeout
+
+        request_id = self._next_id()
+        event = self._register(request_id)
+        self._send_request(_envelope("tools/call", tool_name) % (request_id, _dumps(arguments)))
+        response = self._wait_for_response(event, request_id, timeout=timeout)
         
         if "error" in response and response["error"] is not None:
-            return {
+            result = {
                 "success": False,
                 "message": response["error"].get("message", "Unknown error"),
                 "error": response["error"]
             }
-        
-        return {
-            "success": True,
-            "result": response.get("result", {}),
-            "message": "Success"
-        }
+        else:
+            result = {
+                "success": True,
+                "result": response.get("result", {}),
+                "message": "Success"
+            }
+
+        if cacheable:
+            self._tool_cache[cache_key] = result
+        if workspace_key is not None and result["success"]:
+            self.session.loaded_workspaces[workspace_key] = result
+
+        return result
     
     def close(self):
-        """Clean up and close server connection"""
-        if self.process:
-            try:
-                # Try graceful termination first
-                self.process.terminate()
-                self.process.wait(timeout=5)
-            except subprocess.TimeoutExpired:
-                # Force kill if graceful termination fails
-                try:
-                    os.killpg(os.getpgid(self.process.pid), signal.SIGKILL)
-                except (ProcessLookupError, AttributeError):
-                    pass  # Process already dead or no process group
-            except Exception as e:
-                print(f"Error during cleanup: {e}")
-            finally:
-                self.process = None
+        """Release the client; the shared server stays up for the session"""
+        # Termination is owned by server_session at interpreter exit so
+        # later clients can reuse the warm process and its workspaces.
+        self.process = None
+
+    def cleanup(self):
+        """Alias for close()"""
+        self.close()
     
     def __enter__(self):
         return self